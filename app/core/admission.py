@@ -0,0 +1,79 @@
+import asyncio
+import math
+import time
+
+from fastapi import HTTPException, status
+
+from app.core.metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for slow, LLM-bound routes.
+
+    At most `max_concurrency` requests run at once; others wait in line. A new
+    request is rejected with 503 and Retry-After when the line is full or when
+    its expected completion, estimated from the queue depth and an EWMA of
+    recent service times, would exceed `deadline`. Used as a route dependency.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, deadline: float,
+                 initial_latency: float, alpha: float = 0.2):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.alpha = alpha
+        self.latency = initial_latency
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def expected_completion(self) -> float:
+        """Seconds until a request admitted now would finish"""
+        if self.in_flight < self.max_concurrency and self.waiting == 0:
+            return self.latency
+        # With every slot busy, one frees up every latency / max_concurrency seconds on average
+        return (self.waiting + 1) * self.latency / self.max_concurrency + self.latency
+
+    def _reject(self, expected: float):
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(self.name).inc()
+        retry_after = max(1, math.ceil(expected - self.deadline)) if expected > self.deadline else max(1, math.ceil(self.latency))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy generating other requests, please retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def __call__(self):
+        expected = self.expected_completion()
+        if self.waiting >= self.max_queue or expected > self.deadline:
+            self._reject(expected)
+
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.labels(self.name).set(self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.labels(self.name).set(self.waiting)
+
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            self.latency += self.alpha * (time.monotonic() - started - self.latency)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "latency_ewma": round(self.latency, 2),
+            "expected_completion": round(self.expected_completion(), 2),
+        }
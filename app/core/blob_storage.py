@@ -0,0 +1,113 @@
+import json
+import logging
+import zlib
+from typing import Any, Tuple
+
+from bson import Binary
+
+from app.core.config import settings
+from app.core.database import get_database
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Marker key identifying a packed blob stored in place of a plain field value
+BLOB_MARKER = "_blob"
+
+_bucket = None
+
+
+def _gridfs():
+    global _bucket
+    if _bucket is None:
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        _bucket = AsyncIOMotorGridFSBucket(get_database(), bucket_name="blobs")
+    return _bucket
+
+
+def _codec() -> str:
+    if settings.BLOB_COMPRESSION == "zstd":
+        if zstandard is not None:
+            return "zstd"
+        logger.warning("BLOB_COMPRESSION=zstd but zstandard is not installed; using zlib")
+    return "zlib"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _encode(value: Any) -> Tuple[bytes, str]:
+    if isinstance(value, str):
+        return value.encode("utf-8"), "text"
+    return json.dumps(value, separators=(",", ":")).encode("utf-8"), "json"
+
+
+def is_packed(value: Any) -> bool:
+    """Whether a stored field value is a packed blob"""
+    return isinstance(value, dict) and value.get(BLOB_MARKER) == 1
+
+
+async def pack_blob(value: Any) -> Any:
+    """
+    Prepare a large text or JSON value for storage.
+    Small values and mode "none" are stored as-is; larger ones are compressed
+    inline, and in "gridfs" mode offloaded to GridFS above BLOB_OFFLOAD_MIN_BYTES.
+    """
+    if value is None or settings.BLOB_STORAGE_MODE == "none" or is_packed(value):
+        return value
+    raw, encoding = _encode(value)
+    if len(raw) < settings.BLOB_COMPRESS_MIN_BYTES:
+        return value
+
+    codec = _codec()
+    compressed = _compress(raw, codec)
+    blob = {BLOB_MARKER: 1, "codec": codec, "encoding": encoding, "size": len(raw)}
+    if settings.BLOB_STORAGE_MODE == "gridfs" and len(compressed) >= settings.BLOB_OFFLOAD_MIN_BYTES:
+        blob["gridfs_id"] = await _gridfs().upload_from_stream("blob", compressed)
+    else:
+        blob["data"] = Binary(compressed)
+    return blob
+
+
+async def unpack_blob(value: Any) -> Any:
+    """Restore a value stored by pack_blob; plain values pass through unchanged"""
+    if not is_packed(value):
+        return value
+    if "gridfs_id" in value:
+        stream = await _gridfs().open_download_stream(value["gridfs_id"])
+        compressed = await stream.read()
+    else:
+        compressed = bytes(value["data"])
+    raw = _decompress(compressed, value["codec"])
+    if value["encoding"] == "text":
+        return raw.decode("utf-8")
+    return json.loads(raw)
+
+
+async def delete_blob(value: Any) -> None:
+    """Remove any GridFS file backing a packed value"""
+    if is_packed(value) and "gridfs_id" in value:
+        await _gridfs().delete(value["gridfs_id"])
+
+
+def blob_sizes(value: Any) -> Tuple[int, int]:
+    """Return (raw bytes, stored bytes in the document) for a field value"""
+    if value is None:
+        return 0, 0
+    if is_packed(value):
+        return value["size"], len(value["data"]) if "data" in value else 0
+    raw, _ = _encode(value)
+    return len(raw), len(raw)
@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import before_task_publish, task_postrun, task_prerun
 from app.core.config import settings
+from app.core.tracing import activate, current_span, start_trace
 
 celery_app = Celery(
     "worker",
@@ -15,3 +17,34 @@ celery_app.conf.update(
     timezone='UTC',
     enable_utc=True,
 )
+
+
+# Carry the publishing request's trace into the task as a W3C traceparent header
+@before_task_publish.connect
+def _inject_trace_context(headers=None, **kwargs):
+    parent = current_span()
+    if parent is not None and headers is not None:
+        headers["traceparent"] = parent.traceparent
+
+
+_task_spans = {}
+
+
+@task_prerun.connect
+def _start_task_span(task_id=None, task=None, **kwargs):
+    traceparent = getattr(task.request, "traceparent", None) or (task.request.headers or {}).get("traceparent")
+    root = start_trace(f"celery {task.name}", traceparent, kind="consumer", **{"celery.task_id": task_id})
+    if root is not None:
+        _task_spans[task_id] = (root, activate(root))
+        _task_spans[task_id][1].__enter__()
+
+
+@task_postrun.connect
+def _end_task_span(task_id=None, state=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is not None:
+        root, active = entry
+        root.set_attribute("celery.state", state)
+        if state == "FAILURE":
+            root.status = "error"
+        active.__exit__(None, None, None)
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from app.core.config import settings
+from app.core.metrics import LLM_BREAKER_STATE
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker over a rolling window of recent calls; calls
+    slower than `slow_call_seconds` count as failures. When open, calls fail
+    fast for `open_seconds`, after which up to `half_open_probes` trial calls
+    decide whether to close again. Thread-safe, as LLM calls run in threads.
+    """
+
+    def __init__(self, name: str, window: int, min_calls: int, error_rate: float,
+                 slow_call_seconds: float, open_seconds: float, half_open_probes: int = 1):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        LLM_BREAKER_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        LLM_BREAKER_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self._set_state(HALF_OPEN)
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    raise CircuitOpenError(self.name, self.open_seconds)
+                self._probes += 1
+
+    def record(self, success: bool, duration: float) -> None:
+        ok = success and duration <= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if ok:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+                return
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(OPEN)
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker next lets a probe through; 0 when closed"""
+        with self._lock:
+            if self.state == CLOSED:
+                return 0.0
+            if self.state == HALF_OPEN:
+                return self.open_seconds
+            return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def stats(self) -> dict:
+        return {"state": self.state, "recent_calls": len(self._outcomes), "recent_failures": self._outcomes.count(False)}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Breaker for one model, created on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    window=settings.LLM_BREAKER_WINDOW,
+                    min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                    error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                    slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+                    open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+                    half_open_probes=settings.LLM_BREAKER_HALF_OPEN_PROBES,
+                )
+    return breaker
+
+
+def breaker_stats() -> Dict[str, dict]:
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
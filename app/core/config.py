@@ -26,14 +26,111 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Token revocation: denylist in Mongo, mirrored per worker in a Bloom filter
+    REVOCATION_SYNC_SECONDS: int = 10
+    REVOCATION_REBUILD_SECONDS: int = 3600
+    REVOCATION_FILTER_CAPACITY: int = 100000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+
     # Google OAuth2
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
+    # JWKS endpoint for Google ID token signing keys (point at a local key server in tests)
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
 
     # Google Gemini API
     GEMINI_API_KEY: str
     # LLM model name (e.g., gpt-4, gemini-2.5-flash)
     LLM_MODEL: str = "gemini-2.5-flash"
+    # Prices used for usage cost estimates (USD per million tokens)
+    LLM_PROMPT_COST_PER_MILLION: float = 0.30
+    LLM_OUTPUT_COST_PER_MILLION: float = 2.50
+    USAGE_FLUSH_SECONDS: int = 15
+
+    # Per-user token buckets; "redis" shares them across workers via REDIS_URL
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_LLM_CAPACITY: int = 30
+    RATE_LIMIT_LLM_REFILL_PER_MINUTE: float = 3
+    RATE_LIMIT_UPLOAD_CAPACITY: int = 60
+    RATE_LIMIT_UPLOAD_REFILL_PER_MINUTE: float = 20
+
+    # Per-model LLM circuit breaker
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 5
+    LLM_BREAKER_ERROR_RATE: float = 0.5
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 45
+    LLM_BREAKER_OPEN_SECONDS: float = 30
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 1
+
+    # Admission control for LLM-backed POST routes, per worker
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_MAX_QUEUE: int = 16
+    LLM_ADMISSION_DEADLINE_SECONDS: float = 90
+    KIT_INITIAL_LATENCY_SECONDS: float = 30
+    ANALYSIS_INITIAL_LATENCY_SECONDS: float = 8
+
+    # Logging: JSON lines written from a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    # Per-module overrides, e.g. "app.services.ai_service=DEBUG,pymongo=WARNING"
+    LOG_LEVELS: str = ""
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Comma-separated emails of users allowed on /admin endpoints
+    ADMIN_EMAILS: str = ""
+
+    # Prometheus /metrics: bearer token and/or comma-separated client IPs (not a proxy address); both empty disables it
+    METRICS_TOKEN: str = ""
+    METRICS_ALLOWED_IPS: str = ""
+
+    # Request profiling: sent X-Profile must equal PROFILE_TOKEN (empty disables the header)
+    PROFILE_TOKEN: str = ""
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: int = 5
+    PROFILE_DIR: str = "profiles"
+    PROFILE_KEEP: int = 200
+
+    # Tracing: "none", "jsonl" (TRACE_JSONL_PATH) or "otlp" (OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT)
+    TRACE_EXPORTER: str = "none"
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_JSONL_PATH: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_SERVICE_NAME: str = "ija-backend"
+    TRACE_EXPORT_INTERVAL_SECONDS: float = 2.0
+
+    # Per-worker cache of authenticated users
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Invalidate across workers via a change stream on users (needs a replica set)
+    USER_CACHE_CHANGE_STREAM: bool = False
+
+    # MongoDB index management
+    MONGO_ENSURE_INDEXES: bool = True
+    MONGO_VERIFY_QUERY_PLANS: bool = False
+
+    # Large text fields: "none", "compress" (inline zlib/zstd) or "gridfs" (offload big blobs)
+    BLOB_STORAGE_MODE: str = "compress"
+    BLOB_COMPRESSION: str = "zlib"
+    BLOB_COMPRESS_MIN_BYTES: int = 1024
+    BLOB_OFFLOAD_MIN_BYTES: int = 256 * 1024
+
+    # Response compression (brotli when installed and accepted, otherwise gzip)
+    RESPONSE_COMPRESSION: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+
+    # Resume batch import
+    PDF_WORKER_PROCESSES: int = 2
+    BATCH_UPLOAD_MAX_FILES: int = 50
+    # Declared uncompressed size of all PDFs in one batch, checked before unzipping
+    BATCH_UPLOAD_MAX_TOTAL_BYTES: int = 100 * 1024 * 1024
+
+    # Kit exports: PDFs render in their own process pool; rendered files are cached on disk by content hash
+    EXPORT_WORKER_PROCESSES: int = 2
+    EXPORT_CACHE_DIR: str = "exports"
+    EXPORT_CACHE_KEEP: int = 500
 
     # ignore extra environment variables
     model_config = ConfigDict(extra="ignore")
@@ -1,17 +1,49 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
 import logging
 
 logger = logging.getLogger(__name__)
 
-client = AsyncIOMotorClient(settings.MONGODB_URI)
-db = client[settings.MONGODB_DATABASE]
+# Created on first use and reused for the life of the process (and across warm
+# serverless invocations), so importing the app never builds a client
+_client = None
+_database = None
+
+
+def get_client():
+    """Process-wide Motor client"""
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _client = AsyncIOMotorClient(settings.MONGODB_URI, event_listeners=[MongoCommandMetrics()])
+    return _client
+
+
+def get_database():
+    """Process-wide Motor database"""
+    global _database
+    if _database is None:
+        _database = get_client()[settings.MONGODB_DATABASE]
+    return _database
+
+
+class _LazyDatabase:
+    """Stand-in for the Motor database that creates the client on first collection access"""
+
+    def __getattr__(self, name):
+        return getattr(get_database(), name)
+
+    def __getitem__(self, name):
+        return get_database()[name]
+
+
+db = _LazyDatabase()
 
 async def test_connection():
     """Test MongoDB connection"""
     try:
         # Test the connection
-        await client.admin.command('ping')
+        await get_client().admin.command('ping')
         logger.info("MongoDB connection successful!")
         return True
     except Exception as e:
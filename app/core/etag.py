@@ -0,0 +1,53 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Response, status
+
+# Only the fields an ETag is derived from, so a 304 never loads the document body
+ETAG_PROJECTION = {"updated_at": 1, "created_at": 1}
+
+# Private per-user data: browsers may keep it but must revalidate before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(doc: dict) -> str:
+    """Strong ETag derived from the document id and its last modification time"""
+    version = doc.get("updated_at") or doc.get("created_at")
+    raw = f"{doc['_id']}:{version.isoformat() if version else ''}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+async def not_modified_response(collection, query: dict, if_none_match: Optional[str]) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, checking only the version fields"""
+    if not if_none_match:
+        return None
+    doc = await collection.find_one(query, ETAG_PROJECTION)
+    if doc:
+        etag = compute_etag(doc)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+            )
+    return None
+
+
+def set_etag(response: Response, doc: dict) -> None:
+    """Attach validator headers for a document being returned in full"""
+    response.headers["ETag"] = compute_etag(doc)
+    response.headers["Cache-Control"] = CACHE_CONTROL
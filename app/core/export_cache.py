@@ -0,0 +1,52 @@
+import os
+from typing import Optional
+
+from app.core.config import settings
+from app.core.profiling import run_in_threadpool
+
+
+def _path(key: str, fmt: str) -> str:
+    return os.path.join(settings.EXPORT_CACHE_DIR, f"{key}.{fmt}")
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # Mark as recently used so pruning drops the coldest exports first
+    os.utime(path)
+    return data
+
+
+def _write(path: str, data: bytes) -> None:
+    os.makedirs(settings.EXPORT_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _prune()
+
+
+def _prune() -> None:
+    """Keep only the EXPORT_CACHE_KEEP most recently used exports"""
+    entries = sorted(
+        (entry for entry in os.scandir(settings.EXPORT_CACHE_DIR) if not entry.name.endswith(".tmp")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in entries[settings.EXPORT_CACHE_KEEP:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+async def get_cached_export(key: str, fmt: str) -> Optional[bytes]:
+    """Rendered export stored under its content hash, if any"""
+    return await run_in_threadpool(_read, _path(key, fmt))
+
+
+async def store_export(key: str, fmt: str, data: bytes) -> None:
+    await run_in_threadpool(_write, _path(key, fmt), data)
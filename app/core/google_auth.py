@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwt, JWTError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens locally against Google's signing keys.
+
+    The JWKS is kept in memory and refreshed in the background before the
+    expiry given by its Cache-Control header, so verification normally makes
+    no network request. An unknown key id triggers one early refresh (key
+    rotation), rate limited by min_refresh_interval.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        certs_url: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        min_refresh_interval: float = 60,
+        default_ttl: float = 3600,
+    ):
+        self.client_id = client_id
+        self.certs_url = certs_url
+        self.http_client = http_client or httpx.AsyncClient(timeout=10)
+        self.min_refresh_interval = min_refresh_interval
+        self.default_ttl = default_ttl
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _fetch_keys(self):
+        response = await self.http_client.get(self.certs_url)
+        response.raise_for_status()
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        ttl = int(match.group(1)) if match else self.default_ttl
+        self._keys = {key["kid"]: key for key in response.json()["keys"]}
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + ttl
+        logger.info(f"Loaded {len(self._keys)} Google signing keys, valid for {ttl}s")
+
+    async def refresh(self, force: bool = False):
+        """Reload the signing keys if they are expired (or unconditionally with force)"""
+        async with self._lock:
+            now = time.monotonic()
+            if force and now - self._fetched_at < self.min_refresh_interval:
+                return
+            if force or now >= self._expires_at:
+                await self._fetch_keys()
+
+    async def _refresh_loop(self):
+        while True:
+            # Refresh shortly before the cached keys expire
+            remaining = self._expires_at - time.monotonic()
+            await asyncio.sleep(max(remaining * 0.9, self.min_refresh_interval))
+            try:
+                await self.refresh(force=True)
+            except Exception as e:
+                logger.warning(f"Background refresh of Google signing keys failed: {e}")
+
+    def _ensure_background_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _key_for(self, kid: Optional[str]) -> Dict[str, Any]:
+        if not self._keys or time.monotonic() >= self._expires_at:
+            await self.refresh()
+        self._ensure_background_refresh()
+        if kid not in self._keys:
+            await self.refresh(force=True)
+        if kid not in self._keys:
+            raise ValueError("Token signed with an unknown key")
+        return self._keys[kid]
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """Verify signature, audience, expiry and issuer; returns the token claims"""
+        try:
+            header = jwt.get_unverified_header(token)
+            key = await self._key_for(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=self.client_id,
+                options={"verify_at_hash": False, "leeway": 10},
+            )
+        except JWTError as e:
+            raise ValueError(str(e))
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError("Wrong issuer")
+        return claims
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        await self.http_client.aclose()
+
+
+_verifier: Optional[GoogleTokenVerifier] = None
+
+
+def get_google_verifier() -> GoogleTokenVerifier:
+    """Process-wide verifier, created on first use and reused afterwards"""
+    global _verifier
+    if _verifier is None:
+        _verifier = GoogleTokenVerifier(settings.GOOGLE_CLIENT_ID, settings.GOOGLE_CERTS_URL)
+    return _verifier
+
+
+async def close_google_verifier():
+    global _verifier
+    if _verifier is not None:
+        await _verifier.close()
+        _verifier = None
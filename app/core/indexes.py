@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.database import db
+
+logger = logging.getLogger(__name__)
+
+# Placeholder values used when explaining query shapes; the plan only depends on the shape
+_SAMPLE_USER_ID = "000000000000000000000000"
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """An index that should exist on a collection"""
+    collection: str
+    keys: List[Tuple[str, Any]]
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A hot query whose plan must not fall back to a collection scan"""
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, Any]]] = None
+
+
+INDEXES: List[IndexSpec] = [
+    IndexSpec("users", [("google_id", ASCENDING)], {"unique": True}),
+    IndexSpec("users", [("email", ASCENDING)]),
+    IndexSpec("resumes", [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexSpec("resumes", [("user_id", ASCENDING), ("content_hash", ASCENDING)]),
+    IndexSpec("analyses", [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexSpec("application_kits", [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexSpec("analyses", [("user_id", ASCENDING), ("job_description_id", ASCENDING)]),
+    IndexSpec("application_kits", [("user_id", ASCENDING), ("job_description_id", ASCENDING)]),
+    IndexSpec("revoked_tokens", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    IndexSpec("revoked_tokens", [("revoked_at", ASCENDING)]),
+    IndexSpec("usage", [("user_id", ASCENDING), ("day", ASCENDING), ("section", ASCENDING), ("model", ASCENDING)], {"unique": True}),
+    IndexSpec("application_kits", [("job_description_id", ASCENDING), ("created_at", DESCENDING)]),
+    IndexSpec("application_kits", [("user_id", ASCENDING), ("resume_id", ASCENDING)]),
+    # user_id prefix keeps each search inside one user's entries
+    IndexSpec(
+        "search_documents",
+        [("user_id", ASCENDING), ("title", TEXT), ("text", TEXT)],
+        {"weights": {"title": 5, "text": 1}, "default_language": "english"}
+    ),
+]
+
+QUERY_SHAPES: List[QueryShape] = [
+    QueryShape("users by google_id", "users", {"google_id": "sample"}),
+    QueryShape("users by email", "users", {"email": "sample@example.com"}),
+    QueryShape("resumes by user", "resumes", {"user_id": _SAMPLE_USER_ID}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    QueryShape("resume by id and user", "resumes", {"_id": ObjectId(), "user_id": _SAMPLE_USER_ID}),
+    QueryShape("resume by content hash", "resumes", {"user_id": _SAMPLE_USER_ID, "content_hash": "sample"}),
+    QueryShape("analyses by user", "analyses", {"user_id": _SAMPLE_USER_ID}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    QueryShape("analysis by id and user", "analyses", {"_id": ObjectId(), "user_id": _SAMPLE_USER_ID}),
+    QueryShape("kits by user", "application_kits", {"user_id": _SAMPLE_USER_ID}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    QueryShape("kit by id and user", "application_kits", {"_id": ObjectId(), "user_id": _SAMPLE_USER_ID}),
+    QueryShape("kits by job description", "application_kits", {"job_description_id": "sample"}, [("created_at", DESCENDING)]),
+    QueryShape("kits by resume", "application_kits", {"user_id": _SAMPLE_USER_ID, "resume_id": _SAMPLE_USER_ID}),
+    QueryShape("usage by user since day", "usage", {"user_id": _SAMPLE_USER_ID, "day": {"$gte": "2024-01-01"}}),
+    QueryShape("search by user", "search_documents", {"user_id": _SAMPLE_USER_ID, "$text": {"$search": "sample"}}),
+]
+
+
+async def ensure_indexes() -> List[str]:
+    """Create every registered index; returns the names of indexes that could not be created"""
+    failed = []
+    for spec in INDEXES:
+        try:
+            await db[spec.collection].create_indexes([IndexModel(spec.keys, **spec.options)])
+        except OperationFailure as e:
+            name = f"{spec.collection}.{'_'.join(key for key, _ in spec.keys)}"
+            logger.error(f"Could not create index {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def verify_query_plans() -> List[str]:
+    """
+    Explain every registered query shape; returns the names of shapes that use
+    a COLLSCAN or could not be explained
+    """
+    collscans = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        try:
+            explain = await cursor.explain()
+        except PyMongoError as e:
+            logger.error(f"Could not explain query shape '{shape.name}' on {shape.collection}: {e}")
+            collscans.append(shape.name)
+            continue
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            logger.warning(f"Query shape '{shape.name}' on {shape.collection} falls back to COLLSCAN")
+            collscans.append(shape.name)
+    return collscans
@@ -0,0 +1,147 @@
+import hmac
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from fastapi import HTTPException, status
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Bucket edges tuned for this service: fast API calls up to multi-second LLM chains
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "LLM call latency by chain step and model",
+    ["step", "model"], buckets=LLM_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens", "LLM tokens consumed by chain step, model and kind (prompt/completion)",
+    ["step", "model", "kind"]
+)
+LLM_ERRORS = Counter("llm_errors", "Failed LLM calls by chain step and model", ["step", "model"])
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency",
+    ["command", "collection"], buckets=MONGO_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter("mongodb_command_failures", "Failed MongoDB commands", ["command", "collection"])
+PDF_PARSE_SECONDS = Histogram(
+    "pdf_parse_duration_seconds", "Time to extract and parse an uploaded PDF",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Requests waiting for an LLM slot", ["pool"], multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Counter("admission_rejected", "Requests shed by admission control", ["pool"])
+LLM_BREAKER_STATE = Gauge(
+    "llm_circuit_state", "LLM circuit breaker state per model (0 closed, 1 half-open, 2 open)",
+    ["model"], multiprocess_mode="liveall"
+)
+USER_CACHE_HIT_RATE = Gauge("user_cache_hit_rate", "Authenticated user cache hit rate", multiprocess_mode="liveall")
+
+
+def route_template(scope: Scope) -> str:
+    """Route template (e.g. /resumes/{resume_id}) set by the router, so ids don't explode label cardinality"""
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return "unmatched"
+    # Newer FastAPI keeps included routes unprefixed and records the include separately
+    included = scope.get("fastapi", {}).get("included_router")
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "")
+    return prefix + path
+
+
+async def track_in_flight(request: Request):
+    """App-level dependency counting in-flight requests once the route is resolved"""
+    in_flight = HTTP_IN_FLIGHT.labels(request.method, route_template(request.scope))
+    in_flight.inc()
+    try:
+        yield
+    finally:
+        in_flight.dec()
+
+
+async def require_metrics_access(request: Request):
+    """
+    Allow a scrape that sends `Authorization: Bearer <METRICS_TOKEN>` or comes from
+    an address in METRICS_ALLOWED_IPS; /metrics is hidden when neither is configured
+    """
+    token = request.headers.get("authorization", "")
+    if settings.METRICS_TOKEN and hmac.compare_digest(token, f"Bearer {settings.METRICS_TOKEN}"):
+        return
+    allowed = {ip.strip() for ip in settings.METRICS_ALLOWED_IPS.split(",") if ip.strip()}
+    if request.client and request.client.host in allowed:
+        return
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+class MetricsMiddleware:
+    """Record request latency per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_template(scope), str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the MongoDB latency histogram"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+def render_metrics() -> tuple:
+    """Return (body, content type) for the /metrics endpoint, aggregating workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
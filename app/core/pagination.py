@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+# Keyset order shared by every paginated list; matches the (user_id, created_at, _id) indexes
+PAGE_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(doc: dict) -> str:
+    """Encode the (created_at, _id) position of a document as an opaque token"""
+    raw = json.dumps({"t": doc["created_at"].isoformat(), "id": str(doc["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    """Decode a token produced by encode_cursor"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(raw["t"]), ObjectId(raw["id"])
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Set[str]) -> Set[str]:
+    """Parse a comma-separated fields= selector of large fields to include"""
+    if not fields:
+        return set()
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return requested
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page of documents newest first; returns the documents and the next token"""
+    query = dict(query)
+    if cursor:
+        created_at, oid = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]
+    docs = await collection.find(query, projection).sort(PAGE_SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_token = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_token
@@ -0,0 +1,249 @@
+import asyncio
+import functools
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool as _starlette_run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging_config import request_id_var
+
+# Profile ids are generated here; anything else is never turned into a path
+_PROFILE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _folded_stack(frame, stop_code=None) -> str:
+    """
+    Render a frame chain root-first in the folded format read by flamegraph.pl
+    and speedscope, cutting it below the frame running `stop_code` if given
+    """
+    names = []
+    while frame is not None and frame.f_code is not stop_code:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _awaiting_stack(task: asyncio.Task) -> Optional[str]:
+    """
+    The coroutine chain of a suspended task, root-first, ending in an
+    <awaiting ...> frame for the future or awaitable it is blocked on
+    """
+    names = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    if not names:
+        return None
+    names.append(f"<awaiting {type(awaitable).__name__ if awaitable is not None else 'event loop'}>")
+    return ";".join(names)
+
+
+# Sampler of the request being profiled in this context, read by run_in_threadpool
+_sampler_var: ContextVar[Optional["RequestSampler"]] = ContextVar("profile_sampler", default=None)
+
+
+class RequestSampler(threading.Thread):
+    """
+    Sample the profiled request every `interval` seconds, on wall-clock time.
+    While the event loop is running the request's task, the loop thread's stack
+    is recorded; while the task is suspended, its awaiting coroutine chain is,
+    extended with the stacks of any worker threads running its threadpool
+    calls (those made through run_in_threadpool below). Requests interleaved
+    on the same loop are left out.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float):
+        super().__init__(daemon=True)
+        self.loop = loop
+        self.task = task
+        self.interval = interval
+        self.target_thread = threading.get_ident()
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.workers_lock = threading.Lock()
+        self.workers = set()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            # A busy loop thread holding the GIL delays the sampler; weight each
+            # sample by the intervals elapsed so the counts stay wall-clock time
+            now = time.perf_counter()
+            weight = max(1, round((now - last) / self.interval))
+            last = now
+            frames = sys._current_frames()
+            if asyncio.current_task(self.loop) is self.task:
+                frame = frames.get(self.target_thread)
+                if frame is not None:
+                    self.samples[_folded_stack(frame)] += weight
+                continue
+            if self.task.done():
+                continue
+            awaiting = _awaiting_stack(self.task)
+            if awaiting is None:
+                continue
+            with self.workers_lock:
+                workers = list(self.workers)
+            worker_stacks = [
+                _folded_stack(frames[ident], stop_code=_tracked_call.__code__)
+                for ident in workers if ident in frames
+            ]
+            for stack in worker_stacks or [""]:
+                self.samples[f"{awaiting};{stack}" if stack else awaiting] += weight
+
+
+def _tracked_call(sampler: RequestSampler, func: Callable[[], Any]) -> Any:
+    ident = threading.get_ident()
+    with sampler.workers_lock:
+        sampler.workers.add(ident)
+    try:
+        return func()
+    finally:
+        with sampler.workers_lock:
+            sampler.workers.discard(ident)
+
+
+async def run_in_threadpool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Starlette's run_in_threadpool, but while the request is being profiled the
+    worker thread's stack is sampled as part of the request
+    """
+    func = functools.partial(func, *args, **kwargs)
+    sampler = _sampler_var.get()
+    if sampler is not None:
+        func = functools.partial(_tracked_call, sampler, func)
+    return await _starlette_run_in_threadpool(func)
+
+
+def _profile_requested(scope: Scope) -> bool:
+    token = Headers(scope=scope).get("x-profile")
+    if token and settings.PROFILE_TOKEN:
+        return hmac.compare_digest(token, settings.PROFILE_TOKEN)
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def _write_profile(profile_id: str, request_id: str, scope: Scope, status_code: int, duration: float,
+                   sampler: RequestSampler) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(settings.PROFILE_DIR, profile_id)
+    with open(base + ".folded", "w") as f:
+        for stack, count in sampler.samples.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(base + ".json", "w") as f:
+        json.dump({
+            "profile_id": profile_id,
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "samples": sum(sampler.samples.values()),
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "created_at": datetime.utcnow().isoformat()
+        }, f)
+    _prune_profiles()
+
+
+def _prune_profiles() -> None:
+    """Keep only the PROFILE_KEEP most recent profiles"""
+    metas = sorted(
+        (entry for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in metas[settings.PROFILE_KEEP:]:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(entry.path[:-len(".json")] + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int) -> List[dict]:
+    """Metadata of the most recent profiles, newest first"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(settings.PROFILE_DIR):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    profiles.sort(key=lambda p: p["created_at"], reverse=True)
+    return profiles[:limit]
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored folded profile, or None for unknown or malformed ids"""
+    if not _PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, profile_id + ".folded")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when it carries X-Profile with the configured token, or
+    when the PROFILE_SAMPLE_RATE draw selects it. Profiles are written off the
+    request path, to PROFILE_DIR/<profile id>.folded with a .json sidecar that
+    records the request id; the profile id is generated server-side.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request_id_var.get()
+        profile_id = uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = RequestSampler(asyncio.get_running_loop(), asyncio.current_task(), settings.PROFILE_INTERVAL_MS / 1000)
+        sampler.start()
+        token = _sampler_var.set(sampler)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _sampler_var.reset(token)
+            duration = time.perf_counter() - start
+            sampler.stopped.set()
+            threading.Thread(
+                target=lambda: (sampler.join(), _write_profile(profile_id, request_id, scope, status_code, duration, sampler)),
+                daemon=True
+            ).start()
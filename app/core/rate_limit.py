@@ -0,0 +1,151 @@
+import logging
+import math
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from fastapi import Depends, HTTPException, Response, status
+
+from app.core.config import settings
+from app.core.security import get_current_user
+
+logger = logging.getLogger(__name__)
+
+
+class BucketState(NamedTuple):
+    allowed: bool
+    tokens: float
+
+
+class MemoryBucketBackend:
+    """Token buckets in this process only; the stand-in when Redis is not configured or unreachable"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> BucketState:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now, capacity, rate)
+            bucket = self._buckets[key] = [capacity, now]
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        bucket[0], bucket[1] = tokens, now
+        return BucketState(allowed, tokens)
+
+    def _prune(self, now: float, capacity: float, rate: float) -> None:
+        """Drop buckets that have refilled completely; they are equivalent to new ones"""
+        for key, (tokens, updated) in list(self._buckets.items()):
+            if tokens + (now - updated) * rate >= capacity:
+                del self._buckets[key]
+
+
+# Atomic refill-and-take, using the Redis clock so every worker agrees on time
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketBackend:
+    """Token buckets shared by every worker through Redis"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, only needed with RATE_LIMIT_BACKEND=redis
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_TAKE_SCRIPT)
+        self._fallback = MemoryBucketBackend()
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> BucketState:
+        try:
+            allowed, tokens = await self._script(keys=[key], args=[capacity, rate, cost])
+            return BucketState(bool(allowed), float(tokens))
+        except Exception as e:
+            # Keep limiting per worker rather than failing requests while Redis is down
+            logger.warning(f"Rate limit backend unavailable, using in-memory buckets: {e}")
+            return await self._fallback.take(key, cost, capacity, rate)
+
+
+_backend = None
+
+
+def get_rate_limit_backend():
+    """Process-wide bucket backend chosen by RATE_LIMIT_BACKEND"""
+    global _backend
+    if _backend is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            try:
+                _backend = RedisBucketBackend(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("RATE_LIMIT_BACKEND=redis but the redis package is not installed; using in-memory buckets")
+                _backend = MemoryBucketBackend()
+        else:
+            _backend = MemoryBucketBackend()
+    return _backend
+
+
+def _bucket_config(bucket: str) -> Tuple[float, float]:
+    """(capacity, refill tokens per second) of a named bucket"""
+    if bucket == "llm":
+        return settings.RATE_LIMIT_LLM_CAPACITY, settings.RATE_LIMIT_LLM_REFILL_PER_MINUTE / 60
+    if bucket == "pdf_upload":
+        return settings.RATE_LIMIT_UPLOAD_CAPACITY, settings.RATE_LIMIT_UPLOAD_REFILL_PER_MINUTE / 60
+    raise ValueError(f"Unknown rate limit bucket: {bucket}")
+
+
+class RateLimit:
+    """
+    Per-user token-bucket limit as a route dependency. Routes sharing a bucket
+    draw from the same per-user budget, each at its own cost (a kit chain makes
+    six LLM calls, an analysis one). Sets X-RateLimit-* headers; 429 when empty.
+    """
+
+    def __init__(self, bucket: str, cost: int = 1):
+        self.bucket = bucket
+        self.cost = cost
+
+    async def charge(self, user_id: str, response: Response, cost: int) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        capacity, rate = _bucket_config(self.bucket)
+        cost = min(cost, capacity)
+        state = await get_rate_limit_backend().take(f"ratelimit:{self.bucket}:{user_id}", cost, capacity, rate)
+        headers = {
+            "X-RateLimit-Limit": str(int(capacity)),
+            "X-RateLimit-Remaining": str(int(state.tokens)),
+            "X-RateLimit-Reset": str(math.ceil((capacity - state.tokens) / rate)),
+        }
+        if not state.allowed:
+            headers["Retry-After"] = str(math.ceil((cost - state.tokens) / rate))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded, please retry later",
+                headers=headers,
+            )
+        response.headers.update(headers)
+
+    async def __call__(self, response: Response, current_user=Depends(get_current_user)):
+        await self.charge(current_user.id, response, self.cost)
@@ -0,0 +1,51 @@
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Type
+
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency, falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (stdlib json if orjson is not installed)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def shape(doc: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """Keep only the fields of a response model that are present in a stored document"""
+    return {name: doc[name] for name in model.model_fields if name in doc}
+
+
+def stored_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Return data built from our own stored documents without re-validating it
+    against the response model. Headers set on the injected response are kept.
+    """
+    headers: Iterable = response.headers.items() if response is not None else ()
+    return FastJSONResponse(content=content, status_code=status_code, headers=dict(headers))
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti), stored in the revoked_tokens collection with a TTL
+    index on expires_at, and mirrored in a per-worker Bloom filter.
+
+    Checks consult the filter first, so only the rare positive (a revoked token
+    or a false positive) costs a database lookup. Revocations made by other
+    workers become visible after the next sync, every REVOCATION_SYNC_SECONDS.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime] = None
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        now = datetime.utcnow()
+        await db.revoked_tokens.update_one(
+            {"_id": jti},
+            {"$setOnInsert": {"expires_at": expires_at, "revoked_at": now}},
+            upsert=True
+        )
+        self._filter.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        doc = await db.revoked_tokens.find_one({"_id": jti, "expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1})
+        return doc is not None
+
+    async def rebuild(self) -> None:
+        """Rebuild the filter from all unexpired revocations, dropping expired ones"""
+        started = datetime.utcnow()
+        new_filter = BloomFilter(self.capacity, self.error_rate)
+        async for doc in db.revoked_tokens.find({"expires_at": {"$gt": started}}, {"_id": 1}):
+            new_filter.add(doc["_id"])
+        if new_filter.count > self.capacity:
+            logger.warning(f"{new_filter.count} revoked tokens exceed REVOCATION_FILTER_CAPACITY={self.capacity}")
+        self._filter = new_filter
+        self._synced_at = started
+
+    async def sync(self) -> None:
+        """Add revocations made since the last sync (by any worker) to the filter"""
+        if self._synced_at is None:
+            await self.rebuild()
+            return
+        started = datetime.utcnow()
+        # Overlap the window slightly to tolerate clock skew between workers
+        since = self._synced_at - timedelta(seconds=5)
+        async for doc in db.revoked_tokens.find({"revoked_at": {"$gte": since}}, {"_id": 1}):
+            self._filter.add(doc["_id"])
+        self._synced_at = started
+
+    async def run_sync_loop(self, interval: float, rebuild_interval: float) -> None:
+        last_rebuild = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if asyncio.get_running_loop().time() - last_rebuild >= rebuild_interval:
+                    await self.rebuild()
+                    last_rebuild = asyncio.get_running_loop().time()
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation sync failed: {e}")
+
+
+revocation_list = RevocationList(settings.REVOCATION_FILTER_CAPACITY, settings.REVOCATION_FILTER_ERROR_RATE)
@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import uuid
 
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
+from app.core.revocation import revocation_list
 from app.schemas.token import TokenData
 from app.crud.user import get_user_by_id
 
@@ -18,12 +20,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
 
-def verify_token(token: str):
+def decode_token(token: str) -> dict:
+    """Decode and validate a JWT, returning its claims"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -31,16 +34,28 @@ def verify_token(token: str):
     )
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        if payload.get("sub") is None:
             raise credentials_exception
-        return user_id
+        return payload
     except JWTError:
         raise credentials_exception
 
 
+async def verify_token(token: str):
+    payload = decode_token(token)
+    jti = payload.get("jti")
+    # The Bloom filter answers most checks in memory; only possible hits query Mongo
+    if jti and await revocation_list.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload["sub"]
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    user_id = verify_token(token)
+    user_id = await verify_token(token)
     user = await get_user_by_id(user_id)
     if user is None:
         raise HTTPException(
@@ -49,3 +64,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+
+async def get_admin_user(current_user=Depends(get_current_user)):
+    """Require the current user to be listed in ADMIN_EMAILS"""
+    admins = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
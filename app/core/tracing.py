@@ -0,0 +1,274 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation in a trace; ended spans are handed to the exporter"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "status", "kind")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            _exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class _NoopSpan:
+    """Stand-in used outside sampled traces, so call sites never check"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Innermost active span of the current task/thread; copied into asyncio tasks and threadpool calls
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent span id) from a W3C traceparent header, or (None, None)"""
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, kind: str = "server", **attributes) -> Optional[Span]:
+    """Start a root span (continuing a remote parent when given); None when not sampled or tracing is off"""
+    if settings.TRACE_EXPORTER == "none":
+        return None
+    trace_id, parent_id = _parse_traceparent(traceparent)
+    if trace_id is None:
+        if random.random() >= settings.TRACE_SAMPLE_RATE:
+            return None
+        trace_id = os.urandom(16).hex()
+    return Span(name, trace_id, parent_id, kind, attributes)
+
+
+@contextmanager
+def activate(root: Optional[Span]):
+    """Make a root span current for the block and end it afterwards"""
+    if root is None:
+        yield NOOP_SPAN
+        return
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.status = "error"
+        root.set_attribute("exception", repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current span; a no-op outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(name, parent.trace_id, parent.span_id, attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = "error"
+        child.set_attribute("exception", repr(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+
+def _otlp_payload(spans: List[Span]) -> dict:
+    """Encode spans as an OTLP/HTTP JSON ExportTraceServiceRequest"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.TRACE_SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "app.core.tracing"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": _OTLP_KINDS[s.kind],
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": 2 if s.status == "error" else 1},
+            } for s in spans]
+        }]
+    }]}
+
+
+class _BatchExporter:
+    """Queue ended spans and export them in batches from a background thread"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def submit(self, ended: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(ended)
+        except queue.Full:
+            pass
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _drain(self, max_items: int) -> List[Span]:
+        batch = []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.wait(settings.TRACE_EXPORT_INTERVAL_SECONDS):
+            self._flush()
+        self._flush()
+
+    def _flush(self) -> None:
+        while True:
+            batch = self._drain(512)
+            if not batch:
+                return
+            try:
+                self._export(batch)
+            except Exception as e:
+                logger.warning(f"Span export failed, dropped {len(batch)} spans: {e}")
+
+    def _export(self, batch: List[Span]) -> None:
+        if settings.TRACE_EXPORTER == "otlp":
+            httpx.post(settings.TRACE_OTLP_ENDPOINT, json=_otlp_payload(batch), timeout=5.0).raise_for_status()
+        elif settings.TRACE_EXPORTER == "jsonl":
+            with open(settings.TRACE_JSONL_PATH, "a") as f:
+                for s in batch:
+                    f.write(json.dumps({
+                        "trace_id": s.trace_id, "span_id": s.span_id, "parent_id": s.parent_id,
+                        "name": s.name, "kind": s.kind, "start_ns": s.start_ns, "end_ns": s.end_ns,
+                        "duration_ms": round((s.end_ns - s.start_ns) / 1e6, 3),
+                        "status": s.status, "attributes": s.attributes
+                    }, default=str) + "\n")
+
+    def shutdown(self) -> None:
+        """Export whatever is queued and stop the thread"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+
+
+_exporter = _BatchExporter()
+
+
+def shutdown_tracing() -> None:
+    _exporter.shutdown()
+
+
+class TracingMiddleware:
+    """Start a server span per request, continuing an incoming W3C traceparent"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root = start_trace(
+            f"{scope['method']} {scope['path']}",
+            Headers(scope=scope).get("traceparent"),
+            **{"http.method": scope["method"], "http.target": scope["path"]}
+        )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        with activate(root):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Name the span by route template once routing has resolved it
+                template = route_template(scope)
+                if template != "unmatched":
+                    root.name = f"{scope['method']} {template}"
+                    root.set_attribute("http.route", template)
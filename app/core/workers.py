@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+# Process pools are created on first use and shared for the life of the worker
+_pools: Dict[str, ProcessPoolExecutor] = {}
+
+
+def get_process_pool(name: str, max_workers: int) -> ProcessPoolExecutor:
+    """Get (or lazily create) a bounded process pool by name"""
+    pool = _pools.get(name)
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=max(1, max_workers))
+        _pools[name] = pool
+    return pool
+
+
+async def run_in_process(pool: ProcessPoolExecutor, fn: Callable, *args: Any) -> Any:
+    """Run a picklable function in a process pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, partial(fn, *args))
+
+
+def shutdown_process_pools():
+    """Shut down every process pool created by this worker"""
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
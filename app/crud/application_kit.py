@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from app.core.database import db
+from app.core.tracing import span
+from app.services.ai_service import RESUME_DEPENDENT_SECTIONS
+
+# Every section of a single-shot kit is written from the resume
+SINGLE_SHOT_SECTIONS = ["tailored_resume", "cover_letter"]
+
+
+async def mark_resume_kits_stale(user_id: str, resume_id: str) -> int:
+    """Mark the resume-dependent sections of every kit built from a resume as stale; returns the kits marked"""
+    now = datetime.utcnow()
+    query = {"user_id": user_id, "resume_id": resume_id}
+    with span("mongo.update_many", collection="application_kits"):
+        chain = await db.application_kits.update_many(
+            {**query, "generation_method": "chain"},
+            {"$addToSet": {"stale_sections": {"$each": sorted(RESUME_DEPENDENT_SECTIONS)}}, "$set": {"updated_at": now}}
+        )
+        single = await db.application_kits.update_many(
+            {**query, "generation_method": {"$ne": "chain"}},
+            {"$addToSet": {"stale_sections": {"$each": SINGLE_SHOT_SECTIONS}}, "$set": {"updated_at": now}}
+        )
+    return chain.modified_count + single.modified_count
@@ -0,0 +1,59 @@
+from typing import Dict, List
+from datetime import datetime
+
+from app.core.blob_storage import pack_blob, unpack_blob
+from app.core.database import db
+from app.core.tracing import span
+from app.services.job_description_service import (
+    normalize_job_description, job_description_hash, extract_skills, estimate_token_count
+)
+
+
+async def get_or_create_job_description(text: str) -> dict:
+    """Get the stored job description for this text, creating it with its artefacts on first use"""
+    cleaned_text = normalize_job_description(text)
+    jd_id = job_description_hash(cleaned_text)
+    with span("mongo.find_one", collection="job_descriptions"):
+        doc = await db.job_descriptions.find_one({"_id": jd_id})
+    if doc:
+        doc["cleaned_text"] = await unpack_blob(doc["cleaned_text"])
+        return doc
+
+    doc = {
+        "_id": jd_id,
+        "cleaned_text": cleaned_text,
+        "skills": extract_skills(cleaned_text),
+        "token_count": estimate_token_count(cleaned_text),
+        "created_at": datetime.utcnow()
+    }
+    packed = await pack_blob(cleaned_text)
+    with span("mongo.update_one", collection="job_descriptions"):
+        await db.job_descriptions.update_one(
+            {"_id": jd_id},
+            {"$setOnInsert": {**doc, "cleaned_text": packed}},
+            upsert=True
+        )
+    return doc
+
+
+async def get_job_description(jd_id: str) -> dict:
+    """Get a stored job description by id"""
+    doc = await db.job_descriptions.find_one({"_id": jd_id})
+    if doc:
+        doc["cleaned_text"] = await unpack_blob(doc["cleaned_text"])
+    return doc
+
+
+async def attach_job_descriptions(docs: List[dict]) -> List[dict]:
+    """Fill in job_description text on analyses/kits that reference a job description by id"""
+    ids = list({doc["job_description_id"] for doc in docs if doc.get("job_description_id") and "job_description" not in doc})
+    texts: Dict[str, str] = {}
+    if ids:
+        async for jd in db.job_descriptions.find({"_id": {"$in": ids}}, {"cleaned_text": 1}):
+            texts[jd["_id"]] = await unpack_blob(jd["cleaned_text"])
+    for doc in docs:
+        if "job_description" in doc:
+            doc["job_description"] = await unpack_blob(doc["job_description"])
+        elif doc.get("job_description_id") in texts:
+            doc["job_description"] = texts[doc["job_description_id"]]
+    return docs
@@ -0,0 +1,41 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from app.core.blob_storage import pack_blob, unpack_blob
+from app.core.database import db
+from app.core.tracing import span
+
+
+async def get_parsed_pdf(content_hash: str, parser_version: int) -> Optional[dict]:
+    """Get a previously parsed PDF by the hash of its bytes"""
+    with span("mongo.find_one", collection="parsed_pdfs"):
+        doc = await db.parsed_pdfs.find_one({"_id": content_hash, "parser_version": parser_version})
+    if doc:
+        doc["content"] = await unpack_blob(doc["content"])
+    return doc
+
+
+async def save_parsed_pdf(content_hash: str, parser_version: int, content: str, structured_data: dict) -> None:
+    """Store the extracted text and parsed sections of a PDF under its hash"""
+    packed = await pack_blob(content)
+    with span("mongo.update_one", collection="parsed_pdfs"):
+        await db.parsed_pdfs.update_one(
+            {"_id": content_hash},
+            {"$set": {
+                "parser_version": parser_version,
+                "content": packed,
+                "structured_data": structured_data,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+
+async def get_parsed_pdfs(content_hashes: List[str], parser_version: int) -> Dict[str, dict]:
+    """Get previously parsed PDFs for several hashes at once, keyed by hash"""
+    cursor = db.parsed_pdfs.find({"_id": {"$in": content_hashes}, "parser_version": parser_version})
+    docs = {}
+    async for doc in cursor:
+        doc["content"] = await unpack_blob(doc["content"])
+        docs[doc["_id"]] = doc
+    return docs
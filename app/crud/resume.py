@@ -0,0 +1,41 @@
+import logging
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.core.blob_storage import unpack_blob
+from app.core.database import db
+from app.core.tracing import span
+from app.services.resume_digest_service import build_digest, is_current
+
+logger = logging.getLogger(__name__)
+
+
+async def _store_digest(resume: dict) -> dict:
+    """Build a resume's digest and store it unless the resume was edited in the meantime"""
+    content = await unpack_blob(resume.get("content"))
+    digest = build_digest(resume, content)
+    with span("mongo.update_one", collection="resumes"):
+        await db.resumes.update_one(
+            {"_id": resume["_id"], "updated_at": resume.get("updated_at")},
+            {"$set": {"digest": digest}}
+        )
+    return digest
+
+
+async def refresh_resume_digest(resume_id: str) -> None:
+    """Background task run after a resume is created or edited"""
+    try:
+        resume = await db.resumes.find_one({"_id": ObjectId(resume_id)})
+        if resume:
+            await _store_digest(resume)
+    except PyMongoError as e:
+        logger.warning("Could not store resume digest", extra={"resume_id": resume_id, "error": str(e)})
+
+
+async def get_resume_digest(resume: dict) -> dict:
+    """Digest sent to the LLM in place of the full resume; built now if missing or outdated"""
+    digest = resume.get("digest")
+    if is_current(digest):
+        return digest
+    return await _store_digest(resume)
@@ -0,0 +1,124 @@
+from typing import Any, List, Optional
+from datetime import datetime
+import logging
+import re
+
+from pymongo.errors import PyMongoError
+
+from app.core.blob_storage import unpack_blob
+from app.core.database import db
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Searchable text kept per document; enough for ranking and snippets without storing whole kits
+MAX_SEARCH_TEXT_CHARS = 20000
+SNIPPET_CHARS = 160
+TITLE_CHARS = 100
+
+_TERM_RE = re.compile(r"\w[\w+#.-]*", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _flatten(value: Any) -> List[str]:
+    """Every string inside a nested JSON value"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten(item)]
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in _flatten(item)]
+    return []
+
+
+def _text(*parts: Any) -> str:
+    text = _SPACE_RE.sub(" ", " \n ".join(s for part in parts for s in _flatten(part) if s)).strip()
+    return text[:MAX_SEARCH_TEXT_CHARS]
+
+
+def _jd_title(jd_text: Optional[str]) -> str:
+    """First non-empty line of a job description, usually the role and company"""
+    for line in (jd_text or "").splitlines():
+        if line.strip():
+            return line.strip()[:TITLE_CHARS]
+    return "Untitled job description"
+
+
+async def _upsert(kind: str, ref_id: str, user_id: str, title: str, text: str, created_at: Optional[datetime]) -> None:
+    """Write one search entry; search is best-effort, so failures are logged and not raised"""
+    try:
+        with span("mongo.update_one", collection="search_documents"):
+            await db.search_documents.update_one(
+                {"_id": f"{kind}:{ref_id}"},
+                {"$set": {
+                    "user_id": user_id,
+                    "kind": kind,
+                    "ref_id": ref_id,
+                    "title": title,
+                    "text": text,
+                    "created_at": created_at or datetime.utcnow()
+                }},
+                upsert=True
+            )
+    except PyMongoError as e:
+        logger.warning("Could not update search index", extra={"kind": kind, "ref_id": ref_id, "error": str(e)})
+
+
+async def index_resume(doc: dict) -> None:
+    """Index a resume's name and its extracted PDF text or JSON resume data"""
+    content = await unpack_blob(doc.get("content"))
+    body = content or doc.get("resume_data") or [doc.get(key) for key in ("skills", "experience", "projects", "education")]
+    text = _text(doc.get("resume_name"), body)
+    await _upsert("resume", str(doc["_id"]), doc["user_id"], doc.get("resume_name") or "Untitled resume", text, doc.get("created_at"))
+
+
+async def index_kit(doc: dict, content: dict, jd_text: str) -> None:
+    """Index a kit's job description and generated sections"""
+    sections = {key: value for key, value in content.items() if key not in ("chain_status", "generation_time")}
+    await _upsert("kit", str(doc["_id"]), doc["user_id"], _jd_title(jd_text), _text(jd_text, sections), doc.get("created_at"))
+
+
+async def index_analysis(doc: dict, jd_text: str) -> None:
+    """Index an analysis's job description and keyword results"""
+    text = _text(jd_text, doc.get("experience_level"), doc.get("keywords_found"), doc.get("keywords_missing"))
+    await _upsert("analysis", str(doc["_id"]), doc["user_id"], _jd_title(jd_text), text, doc.get("created_at"))
+
+
+async def remove_from_index(kind: str, ref_id: str) -> None:
+    try:
+        await db.search_documents.delete_one({"_id": f"{kind}:{ref_id}"})
+    except PyMongoError as e:
+        logger.warning("Could not update search index", extra={"kind": kind, "ref_id": ref_id, "error": str(e)})
+
+
+def make_snippet(text: str, query: str) -> str:
+    """A short window of the text around the first query term it contains"""
+    terms = [term.lower() for term in _TERM_RE.findall(query) if len(term) > 1]
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    start = max(0, min(positions) - SNIPPET_CHARS // 3) if positions else 0
+    end = min(len(text), start + SNIPPET_CHARS)
+    snippet = text[start:end].strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+async def search_documents(user_id: str, query: str, kinds: Optional[List[str]], limit: int) -> List[dict]:
+    """Text-search a user's resumes, kits and analyses, best matches first"""
+    filter = {"user_id": user_id, "$text": {"$search": query}}
+    if kinds:
+        filter["kind"] = {"$in": kinds}
+    projection = {"score": {"$meta": "textScore"}, "kind": 1, "ref_id": 1, "title": 1, "text": 1, "created_at": 1}
+    with span("mongo.find", collection="search_documents"):
+        cursor = db.search_documents.find(filter, projection).sort([("score", {"$meta": "textScore"})]).limit(limit)
+        docs = await cursor.to_list(limit)
+    return [
+        {
+            "kind": doc["kind"],
+            "id": doc["ref_id"],
+            "title": doc["title"],
+            "snippet": make_snippet(doc.get("text", ""), query),
+            "score": round(doc["score"], 3),
+            "created_at": doc["created_at"]
+        }
+        for doc in docs
+    ]
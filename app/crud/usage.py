@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.database import db
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ("calls", "errors", "cached_calls", "prompt_tokens", "output_tokens", "latency_ms")
+
+
+class UsageFlusher:
+    """
+    Aggregate LLM usage records in memory per (user, day, section, model) and
+    write them to the usage collection as batched $inc upserts.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[str, str, str, str], Dict[str, int]] = {}
+        self._lock = asyncio.Lock()
+
+    def record(self, user_id: str, records: List[dict]) -> None:
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        for r in records:
+            counters = self._pending.setdefault((user_id, day, r["step"], r["model"]), dict.fromkeys(_COUNTERS, 0))
+            counters["calls"] += 1
+            counters["errors"] += r["status"] != "success"
+            counters["cached_calls"] += bool(r["cached"])
+            counters["prompt_tokens"] += r["prompt_tokens"]
+            counters["output_tokens"] += r["output_tokens"]
+            counters["latency_ms"] += r["latency_ms"]
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            operations = [
+                UpdateOne(
+                    {"user_id": user_id, "day": day, "section": section, "model": model},
+                    {"$inc": counters, "$set": {"updated_at": datetime.utcnow()}},
+                    upsert=True
+                )
+                for (user_id, day, section, model), counters in pending.items()
+            ]
+            try:
+                await db.usage.bulk_write(operations, ordered=False)
+            except Exception as e:
+                # Put the counts back so they are retried with the next flush
+                logger.warning(f"Usage flush failed, will retry: {e}")
+                for key, counters in pending.items():
+                    merged = self._pending.setdefault(key, dict.fromkeys(_COUNTERS, 0))
+                    for name, value in counters.items():
+                        merged[name] += value
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+
+usage_flusher = UsageFlusher()
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int) -> float:
+    """Estimated spend in USD from the configured per-million-token prices"""
+    return round(
+        prompt_tokens / 1_000_000 * settings.LLM_PROMPT_COST_PER_MILLION
+        + output_tokens / 1_000_000 * settings.LLM_OUTPUT_COST_PER_MILLION,
+        6
+    )
+
+
+async def get_usage_summary(user_id: str, days: int) -> dict:
+    """Summarize a user's LLM usage over the last `days` days, per section"""
+    since = (datetime.utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    pipeline = [
+        {"$match": {"user_id": user_id, "day": {"$gte": since}}},
+        {"$group": {"_id": "$section", **{name: {"$sum": f"${name}"} for name in _COUNTERS}}},
+        {"$sort": {"_id": 1}}
+    ]
+    sections = []
+    async for doc in db.usage.aggregate(pipeline):
+        section = {"section": doc["_id"], **{name: doc[name] for name in _COUNTERS}}
+        section["estimated_cost"] = estimate_cost(doc["prompt_tokens"], doc["output_tokens"])
+        sections.append(section)
+    totals = {name: sum(s[name] for s in sections) for name in _COUNTERS}
+    totals["estimated_cost"] = round(sum(s["estimated_cost"] for s in sections), 6)
+    return {"user_id": user_id, "since": since, "totals": totals, "sections": sections}
@@ -1,20 +1,36 @@
 from typing import Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
+import asyncio
+import logging
 
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import db
 from app.models.user import User
 from app.schemas.user import UserCreate
 
+logger = logging.getLogger(__name__)
+
+# Users looked up on every authenticated request, cached per worker
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
 
 async def get_user_by_id(user_id: str) -> Optional[User]:
     """Get user by ID"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
     try:
         oid = ObjectId(user_id)
         doc = await db.users.find_one({"_id": oid})
         if doc:
             doc["id"] = str(doc["_id"])
-            return User(**doc)
+            user = User(**doc)
+            user_cache.set(user_id, user)
+            return user
         return None
     except Exception:
         return None
@@ -51,6 +67,7 @@ async def create_user(user_data: UserCreate) -> User:
     }
     result = await db.users.insert_one(doc)
     doc["id"] = str(result.inserted_id)
+    user_cache.invalidate(doc["id"])
     return User(**doc)
 
 
@@ -60,8 +77,36 @@ async def update_user(user_id: str, updates: dict) -> Optional[User]:
         oid = ObjectId(user_id)
         updates["updated_at"] = datetime.utcnow()
         result = await db.users.update_one({"_id": oid}, {"$set": updates})
+        user_cache.invalidate(user_id)
         if result.modified_count > 0:
             return await get_user_by_id(user_id)
         return None
     except Exception:
         return None
+
+
+async def watch_user_changes():
+    """
+    Invalidate cached users changed by any worker, using a change stream on users.
+    Requires a replica set; reconnects with backoff on transient errors.
+    """
+    delay = 1
+    while True:
+        try:
+            pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+            async with db.users.watch(pipeline) as stream:
+                delay = 1
+                async for change in stream:
+                    user_cache.invalidate(str(change["documentKey"]["_id"]))
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            # e.g. not running against a replica set; retrying will not help
+            logger.error(f"User cache change stream unavailable: {e}")
+            return
+        except PyMongoError as e:
+            logger.warning(f"User cache change stream interrupted: {e}; retrying in {delay}s")
+            # Anything missed while disconnected may be stale
+            user_cache.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
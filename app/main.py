@@ -1,19 +1,34 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.routers import auth, resumes, application_kits
-from app.routers import analysis
+from app.routers import admin, analysis, search, usage
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.logging_config import RequestIdMiddleware, configure_logging
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, shutdown_tracing
+from app.core.metrics import MetricsMiddleware, USER_CACHE_HIT_RATE, render_metrics, require_metrics_access, track_in_flight
+from app.core.responses import FastJSONResponse
 from app.core.database import test_connection
+from app.core.indexes import ensure_indexes, verify_query_plans
+from app.core.workers import shutdown_process_pools
+from app.core.google_auth import close_google_verifier
+from app.core.revocation import revocation_list
+from app.crud.usage import usage_flusher
+from app.crud.user import user_cache, watch_user_changes
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(track_in_flight)],
 )
 
 # CORS configuration
@@ -37,13 +52,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag", "X-Request-ID", "X-Profile-Id", "Retry-After",
+        "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset",
+    ],
 )
 
+if settings.RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES)
+
+# Metrics wrap compression and CORS handling; the request id is set outermost
+# so every log record of the request carries it
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
 app.include_router(application_kits.router, prefix="/application-kits", tags=["application_kits"])
 app.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
+app.include_router(usage.router, prefix="/usage", tags=["usage"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+# Long-running tasks started at startup and cancelled at shutdown
+background_tasks = []
 
 # Startup event to test MongoDB connection
 @app.on_event("startup")
@@ -53,8 +88,33 @@ async def startup_event():
     if not connection_ok:
         logger.warning("MongoDB connection failed - some features may not work")
     else:
+        if settings.MONGO_ENSURE_INDEXES:
+            failed = await ensure_indexes()
+            if failed:
+                logger.warning(f"Some MongoDB indexes could not be created: {failed}")
+        if settings.MONGO_VERIFY_QUERY_PLANS:
+            collscans = await verify_query_plans()
+            if collscans:
+                logger.warning(f"Query shapes using a collection scan or failing to explain: {collscans}")
+        await revocation_list.rebuild()
+        background_tasks.append(asyncio.create_task(
+            revocation_list.run_sync_loop(settings.REVOCATION_SYNC_SECONDS, settings.REVOCATION_REBUILD_SECONDS)
+        ))
+        background_tasks.append(asyncio.create_task(usage_flusher.run(settings.USAGE_FLUSH_SECONDS)))
+        if settings.USER_CACHE_CHANGE_STREAM:
+            background_tasks.append(asyncio.create_task(watch_user_changes()))
         logger.info("All systems ready!")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    await usage_flusher.flush()
+    shutdown_process_pools()
+    await close_google_verifier()
+    shutdown_tracing()
+
 # Healthcheck
 @app.get("/health", tags=["health"])
 async def health_check():
@@ -64,6 +124,13 @@ async def health_check():
         "mongodb": "connected" if connection_ok else "disconnected"
     }
 
+# Prometheus scrape endpoint; needs METRICS_TOKEN or an allowlisted client address
+@app.get("/metrics", tags=["health"], include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    USER_CACHE_HIT_RATE.set(user_cache.stats()["hit_rate"])
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Debug endpoint to catch any unhandled requests
 @app.get("/", tags=["root"])
 async def root():
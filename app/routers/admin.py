@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.core.circuit_breaker import breaker_stats
+from app.core.profiling import list_profiles, profile_path
+from app.core.security import get_admin_user
+from app.crud.user import user_cache
+from app.routers.analysis import analysis_admission
+from app.routers.application_kits import kit_admission
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def read_stats(admin=Depends(get_admin_user)):
+    """
+    Per-worker user cache, admission and LLM circuit breaker state
+    """
+    return {
+        "user_cache": user_cache.stats(),
+        "admission": {
+            "application_kits": kit_admission.stats(),
+            "analysis": analysis_admission.stats()
+        },
+        "llm_breakers": breaker_stats()
+    }
+
+
+@router.get("/profiles")
+async def read_profiles(limit: int = Query(50, ge=1, le=500), admin=Depends(get_admin_user)):
+    """
+    List recent request profiles, newest first
+    """
+    return list_profiles(limit)
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, admin=Depends(get_admin_user)):
+    """
+    Download a profile in folded-stack format (flamegraph.pl, speedscope)
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
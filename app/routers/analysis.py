@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from typing import Optional
 from bson import ObjectId
 from datetime import datetime
 
-from app.schemas.analysis import AnalysisCreate, AnalysisOut
+from app.schemas.analysis import AnalysisCreate, AnalysisOut, AnalysisSummary
+from app.schemas.pagination import Page
+from app.core.admission import AdmissionController
+from app.core.blob_storage import unpack_blob
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
 from app.core.database import db
+from app.core.etag import not_modified_response, set_etag
+from app.core.pagination import fetch_page, parse_fields
+from app.core.profiling import run_in_threadpool
+from app.core.rate_limit import RateLimit
+from app.core.responses import shape, stored_response
 from app.core.security import get_current_user
-from app.services.ai_service import analyze_resume_content
+from app.core.tracing import span
+from app.crud.job_description import attach_job_descriptions, get_or_create_job_description
+from app.crud.resume import get_resume_digest
+from app.crud.search import index_analysis
+from app.crud.usage import usage_flusher
+from app.services.ai_service import analyze_resume_content, collect_usage, step_usage
+from app.services.fallback_service import heuristic_analysis, resume_text
+from app.services.job_description_service import extract_skills
 
 router = APIRouter()
 
+# Sheds analysis load once the expected wait would pass the deadline
+analysis_admission = AdmissionController(
+    "analysis",
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    deadline=settings.LLM_ADMISSION_DEADLINE_SECONDS,
+    initial_latency=settings.ANALYSIS_INITIAL_LATENCY_SECONDS,
+)
+
+# Charged once a request has been admitted and the resume found, so shed or rejected requests cost nothing
+llm_limit = RateLimit("llm")
+
+# Fields left out of list responses unless requested with fields=
+LARGE_ANALYSIS_FIELDS = {"job_description"}
+
 def _obj_id(id: str):
     try:
         return ObjectId(id)
@@ -17,44 +49,91 @@ def _obj_id(id: str):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid analysis ID or resume ID")
 
 @router.post("/", response_model=AnalysisOut, status_code=status.HTTP_201_CREATED)
-async def create_analysis(request: AnalysisCreate, current_user=Depends(get_current_user)):
+async def create_analysis(
+    request: AnalysisCreate,
+    response: Response,
+    current_user=Depends(get_current_user),
+    admission=Depends(analysis_admission)
+):
     # Validate resume
-    resume = await db.resumes.find_one({"_id": ObjectId(request.resume_id), "user_id": current_user.id})
+    with span("mongo.find_one", collection="resumes"):
+        resume = await db.resumes.find_one({"_id": ObjectId(request.resume_id), "user_id": current_user.id})
     if not resume:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    await llm_limit.charge(current_user.id, response, 1)
     
-    # Generate analysis directly
-    result = analyze_resume_content(resume.get("resume_data"), request.job_description, request.experience_level)
+    jd = await get_or_create_job_description(request.job_description)
+    
+    resume_digest = await get_resume_digest(resume)
+    
+    # Generate analysis directly, falling back to keyword matching while the LLM circuit is open
+    try:
+        with collect_usage() as usage:
+            result = await run_in_threadpool(
+                analyze_resume_content, resume_digest, jd["cleaned_text"], request.experience_level
+            )
+        chain_status = [{"step": "analysis", "status": "success", "usage": step_usage(usage, "analysis")}]
+        analysis_status = "complete"
+    except CircuitOpenError:
+        content = await unpack_blob(resume.get("content"))
+        jd_skills = jd.get("skills") or extract_skills(jd["cleaned_text"])
+        result = heuristic_analysis(resume_text(resume, content), jd_skills)
+        chain_status = [{"step": "analysis", "status": "heuristic", "reason": "circuit_open"}]
+        analysis_status = "degraded"
+    usage_flusher.record(current_user.id, usage)
     
     # Store
     data = {
         "user_id": current_user.id,
         "resume_id": request.resume_id,
-        "job_description": request.job_description,
+        "job_description_id": jd["_id"],
         "experience_level": request.experience_level,
         "score": result.get("score"),
         "keywords_found": result.get("keywords_found"),
         "keywords_missing": result.get("keywords_missing"),
+        "chain_status": chain_status,
+        "status": analysis_status,
         "created_at": datetime.utcnow()
     }
-    res = await db.analyses.insert_one(data)
+    with span("mongo.insert_one", collection="analyses"):
+        res = await db.analyses.insert_one(data)
     data["id"] = str(res.inserted_id)
+    data["job_description"] = jd["cleaned_text"]
+    await index_analysis(data, jd["cleaned_text"])
     return data
 
-@router.get("/", response_model=List[AnalysisOut])
-async def list_analyses(current_user=Depends(get_current_user)):
-    cursor = db.analyses.find({"user_id": current_user.id})
-    analyses = []
-    async for doc in cursor:
+@router.get("/", response_model=Page[AnalysisSummary], response_model_exclude_unset=True)
+async def list_analyses(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated large fields to include: job_description"),
+    current_user=Depends(get_current_user)
+):
+    include = parse_fields(fields, LARGE_ANALYSIS_FIELDS)
+    projection = {field: 0 for field in LARGE_ANALYSIS_FIELDS - include}
+    docs, next_token = await fetch_page(db.analyses, {"user_id": current_user.id}, limit, cursor, projection)
+    for doc in docs:
         doc["id"] = str(doc["_id"])
-        analyses.append(doc)
-    return analyses
+    if "job_description" in include:
+        await attach_job_descriptions(docs)
+    return stored_response({"items": [shape(doc, AnalysisSummary) for doc in docs], "next": next_token})
 
 @router.get("/{analysis_id}", response_model=AnalysisOut)
-async def get_analysis(analysis_id: str, current_user=Depends(get_current_user)):
+async def get_analysis(
+    analysis_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(get_current_user)
+):
     oid = _obj_id(analysis_id)
-    doc = await db.analyses.find_one({"_id": oid, "user_id": current_user.id})
+    query = {"_id": oid, "user_id": current_user.id}
+    not_modified = await not_modified_response(db.analyses, query, if_none_match)
+    if not_modified:
+        return not_modified
+    doc = await db.analyses.find_one(query)
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found")
+    set_etag(response, doc)
     doc["id"] = str(doc["_id"])
-    return doc
+    await attach_job_descriptions([doc])
+    return stored_response(shape(doc, AnalysisOut), response)
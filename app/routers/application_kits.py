@@ -1,15 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from typing import List, Optional
 from datetime import datetime
+import math
 from bson import ObjectId
 
-from app.schemas.application_kit import ApplicationKitCreate, ApplicationKitOut
+from app.schemas.application_kit import ApplicationKitCreate, ApplicationKitOut, ApplicationKitSummary
+from app.schemas.pagination import Page
+from app.core.admission import AdmissionController
+from app.core.blob_storage import delete_blob, pack_blob, unpack_blob
+from app.core.circuit_breaker import CircuitOpenError, get_breaker
+from app.core.config import settings
 from app.core.database import db
+from app.core.etag import CACHE_CONTROL, etag_matches, not_modified_response, set_etag
+from app.core.export_cache import get_cached_export, store_export
+from app.core.pagination import fetch_page, parse_fields
+from app.core.profiling import run_in_threadpool
+from app.core.rate_limit import RateLimit
+from app.core.responses import shape, stored_response
 from app.core.security import get_current_user
-from app.services.ai_service import generate_application_kit_content, generate_application_kit_content_chain
+from app.core.tracing import span
+from app.core.workers import get_process_pool, run_in_process
+from app.crud.application_kit import SINGLE_SHOT_SECTIONS
+from app.crud.job_description import attach_job_descriptions, get_or_create_job_description
+from app.crud.resume import get_resume_digest
+from app.crud.search import index_kit
+from app.crud.usage import usage_flusher
+from app.services.ai_service import (
+    CHAIN_SECTIONS, RESUME_DEPENDENT_SECTIONS, collect_usage, generate_application_kit_content,
+    generate_application_kit_content_chain, generate_sections, step_usage
+)
+from app.services.export_service import (
+    EXPORT_MEDIA_TYPES, export_key, export_sections, render_docx, render_html, render_markdown, render_pdf
+)
+from app.services.resume_digest_service import full_resume_data
 
 router = APIRouter()
 
+# Sheds kit generation load once the expected wait would pass the deadline
+kit_admission = AdmissionController(
+    "application_kits",
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    deadline=settings.LLM_ADMISSION_DEADLINE_SECONDS,
+    initial_latency=settings.KIT_INITIAL_LATENCY_SECONDS,
+)
+
+# Fields left out of list responses unless requested with fields=
+LARGE_KIT_FIELDS = {"generated_content", "job_description"}
+
+# Sections tailored to a resume; the rest depend on the job description alone
+RESUME_BOUND_SECTIONS = RESUME_DEPENDENT_SECTIONS | {"tailored_resume"}
+# Recent kits for a job description searched for cached sections while the LLM circuit is open
+KIT_CACHE_LOOKBACK = 20
+
+# Charged once a request has been admitted and validated, so shed or rejected
+# requests cost nothing: six for a chain kit, one per regenerated section
+llm_limit = RateLimit("llm")
+
 
 def _obj_id(id: str):
     try:
@@ -18,72 +65,391 @@ def _obj_id(id: str):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid kit ID")
 
 
+async def _insert_kit(data: dict) -> dict:
+    """
+    Store a kit with generated content packed and the job description kept only
+    in the job_descriptions collection; returns the kit as given, with its id
+    """
+    stored = {k: v for k, v in data.items() if k != "job_description"}
+    stored["generated_content"] = await pack_blob(data["generated_content"])
+    with span("mongo.insert_one", collection="application_kits"):
+        res = await db.application_kits.insert_one(stored)
+    data["id"] = str(res.inserted_id)
+    await index_kit({**stored, "_id": res.inserted_id}, data["generated_content"], data["job_description"])
+    return data
+
+
+async def _unpack_kit(doc: dict) -> dict:
+    """Restore the packed generated content of a stored kit"""
+    if "generated_content" in doc:
+        doc["generated_content"] = await unpack_blob(doc["generated_content"])
+    return doc
+
+
+def _usable(content: dict, section: str) -> bool:
+    """Whether a kit section holds real content rather than a placeholder or error text"""
+    value = content.get(section)
+    if not value or (isinstance(value, str) and value.startswith("Error")):
+        return False
+    for entry in content.get("chain_status") or []:
+        if entry.get("step") == section and entry.get("status") in ("failed", "skipped"):
+            return False
+    return True
+
+
+async def _fill_from_cache(content: dict, sections: List[str], user_id: str, resume_id: str, jd_id: str) -> None:
+    """
+    Fill missing sections from the most recent kits for the same job description.
+    Sections written from the resume only come from this user's kits for the same resume.
+    """
+    missing = [section for section in sections if not _usable(content, section)]
+    if not missing:
+        return
+    query = {"job_description_id": jd_id}
+    if all(section in RESUME_BOUND_SECTIONS for section in missing):
+        query.update({"user_id": user_id, "resume_id": resume_id})
+    with span("mongo.find", collection="application_kits"):
+        cursor = db.application_kits.find(query, {"user_id": 1, "resume_id": 1, "generated_content": 1})
+        docs = await cursor.sort("created_at", -1).limit(KIT_CACHE_LOOKBACK).to_list(KIT_CACHE_LOOKBACK)
+    statuses = {entry.get("step"): entry for entry in content.setdefault("chain_status", [])}
+    for doc in docs:
+        same_resume = doc.get("user_id") == user_id and doc.get("resume_id") == resume_id
+        cached = await unpack_blob(doc.get("generated_content")) or {}
+        for section in list(missing):
+            if section in RESUME_BOUND_SECTIONS and not same_resume:
+                continue
+            if _usable(cached, section):
+                content[section] = cached[section]
+                missing.remove(section)
+                entry = {"step": section, "status": "cached"}
+                # Only this user's own kits are named; JD-only sections may come from anyone's kit
+                if same_resume:
+                    entry["source_kit_id"] = str(doc["_id"])
+                if section in statuses:
+                    statuses[section].clear()
+                    statuses[section].update(entry)
+                else:
+                    content["chain_status"].append(entry)
+        if not missing:
+            break
+
+
+def _degraded(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Generation is temporarily unavailable and no cached content exists for this job description",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
 @router.post("/", response_model=ApplicationKitOut, status_code=status.HTTP_201_CREATED)
-async def create_kit(kit: ApplicationKitCreate, current_user=Depends(get_current_user)):
+async def create_kit(
+    kit: ApplicationKitCreate,
+    response: Response,
+    current_user=Depends(get_current_user),
+    admission=Depends(kit_admission)
+):
     # Fetch resume
-    resume = await db.resumes.find_one({"_id": ObjectId(kit.resume_id), "user_id": current_user.id})
+    with span("mongo.find_one", collection="resumes"):
+        resume = await db.resumes.find_one({"_id": ObjectId(kit.resume_id), "user_id": current_user.id})
     if not resume:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    await llm_limit.charge(current_user.id, response, 1)
     
-    # Generate content directly (original implementation)
-    generated_content = generate_application_kit_content(resume.get("resume_data"), kit.job_description)
+    jd = await get_or_create_job_description(kit.job_description)
+    
+    # Generate content directly (original implementation); the tailored resume needs the full resume, not the digest
+    try:
+        with collect_usage() as usage:
+            generated_content = await run_in_threadpool(
+                generate_application_kit_content, full_resume_data(resume), jd["cleaned_text"]
+            )
+        produced = any(_usable(generated_content, section) for section in SINGLE_SHOT_SECTIONS)
+        generated_content["chain_status"] = [
+            {"step": "kit", "status": "success" if produced else "failed", "usage": step_usage(usage, "kit")}
+        ]
+    except CircuitOpenError:
+        generated_content = {"chain_status": []}
+    usage_flusher.record(current_user.id, usage)
+    
+    # Sections the call did not produce (error placeholders, or an open LLM circuit) come from earlier kits where possible
+    kit_status = "complete"
+    if not all(_usable(generated_content, section) for section in SINGLE_SHOT_SECTIONS):
+        await _fill_from_cache(generated_content, SINGLE_SHOT_SECTIONS, current_user.id, kit.resume_id, jd["_id"])
+        if not any(_usable(generated_content, section) for section in SINGLE_SHOT_SECTIONS):
+            raise _degraded(get_breaker(settings.LLM_MODEL).retry_after())
+        for section in SINGLE_SHOT_SECTIONS:
+            if not _usable(generated_content, section):
+                generated_content.pop(section, None)
+                generated_content["chain_status"].append({"step": section, "status": "failed"})
+        kit_status = "degraded"
     
     # Store in DB
     data = {
         "user_id": current_user.id,
         "resume_id": kit.resume_id,
-        "job_description": kit.job_description,
+        "job_description_id": jd["_id"],
+        "job_description": jd["cleaned_text"],
         "generated_content": generated_content,
+        "status": kit_status,
         "created_at": datetime.utcnow()
     }
-    res = await db.application_kits.insert_one(data)
-    data["id"] = str(res.inserted_id)
-    return data
+    return await _insert_kit(data)
 
 
 @router.post("/chain", response_model=ApplicationKitOut, status_code=status.HTTP_201_CREATED)
-async def create_kit_chain(kit: ApplicationKitCreate, current_user=Depends(get_current_user)):
+async def create_kit_chain(
+    kit: ApplicationKitCreate,
+    response: Response,
+    current_user=Depends(get_current_user),
+    admission=Depends(kit_admission)
+):
     """
     Generate application kit using chain approach with all entities:
     email, cover_letter, q_and_a, dsa, experiences, playlists
     """
     # Fetch resume
-    resume = await db.resumes.find_one({"_id": ObjectId(kit.resume_id), "user_id": current_user.id})
+    with span("mongo.find_one", collection="resumes"):
+        resume = await db.resumes.find_one({"_id": ObjectId(kit.resume_id), "user_id": current_user.id})
     if not resume:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    await llm_limit.charge(current_user.id, response, len(CHAIN_SECTIONS))
+    
+    jd = await get_or_create_job_description(kit.job_description)
+    resume_digest = await get_resume_digest(resume)
     
     # Generate content using chain approach
-    generated_content = generate_application_kit_content_chain(resume.get("resume_data"), kit.job_description)
+    with collect_usage() as usage:
+        generated_content = await run_in_threadpool(
+            generate_application_kit_content_chain, resume_digest, jd["cleaned_text"]
+        )
+    usage_flusher.record(current_user.id, usage)
+    
+    # Steps that failed or were skipped by an open LLM circuit are served from earlier kits where possible
+    kit_status = "complete"
+    if not all(_usable(generated_content, section) for section in CHAIN_SECTIONS):
+        await _fill_from_cache(generated_content, CHAIN_SECTIONS, current_user.id, kit.resume_id, jd["_id"])
+        if not any(_usable(generated_content, section) for section in CHAIN_SECTIONS):
+            raise _degraded(get_breaker(settings.LLM_MODEL).retry_after())
+        kit_status = "degraded"
     
     # Store in DB
     data = {
         "user_id": current_user.id,
         "resume_id": kit.resume_id,
-        "job_description": kit.job_description,
+        "job_description_id": jd["_id"],
+        "job_description": jd["cleaned_text"],
         "generated_content": generated_content,
         "generation_method": "chain",
+        "status": kit_status,
         "created_at": datetime.utcnow()
     }
-    res = await db.application_kits.insert_one(data)
-    data["id"] = str(res.inserted_id)
-    return data
+    return await _insert_kit(data)
 
 
-@router.get("/", response_model=List[ApplicationKitOut])
-async def list_kits(current_user=Depends(get_current_user)):
-    cursor = db.application_kits.find({"user_id": current_user.id})
-    kits = []
-    async for doc in cursor:
+@router.get("/", response_model=Page[ApplicationKitSummary], response_model_exclude_unset=True)
+async def list_kits(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated large fields to include: generated_content, job_description"),
+    current_user=Depends(get_current_user)
+):
+    include = parse_fields(fields, LARGE_KIT_FIELDS)
+    projection = {field: 0 for field in LARGE_KIT_FIELDS - include}
+    docs, next_token = await fetch_page(db.application_kits, {"user_id": current_user.id}, limit, cursor, projection)
+    for doc in docs:
         doc["id"] = str(doc["_id"])
-        kits.append(doc)
-    return kits
+        await _unpack_kit(doc)
+    if "job_description" in include:
+        await attach_job_descriptions(docs)
+    return stored_response({"items": [shape(doc, ApplicationKitSummary) for doc in docs], "next": next_token})
 
 
 @router.get("/{kit_id}", response_model=ApplicationKitOut)
-async def get_kit(kit_id: str, current_user=Depends(get_current_user)):
+async def get_kit(
+    kit_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(get_current_user)
+):
     oid = _obj_id(kit_id)
-    doc = await db.application_kits.find_one({"_id": oid, "user_id": current_user.id})
+    query = {"_id": oid, "user_id": current_user.id}
+    not_modified = await not_modified_response(db.application_kits, query, if_none_match)
+    if not_modified:
+        return not_modified
+    doc = await db.application_kits.find_one(query)
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kit not found")
+    set_etag(response, doc)
     doc["id"] = str(doc["_id"])
-    return doc
+    await attach_job_descriptions([doc])
+    await _unpack_kit(doc)
+    return stored_response(shape(doc, ApplicationKitOut), response)
+
+
+@router.post("/{kit_id}/regenerate", response_model=ApplicationKitOut)
+async def regenerate_kit_sections(
+    kit_id: str,
+    response: Response,
+    sections: Optional[str] = Query(None, description="Comma-separated sections to regenerate; defaults to the kit's stale sections"),
+    current_user=Depends(get_current_user),
+    admission=Depends(kit_admission)
+):
+    """
+    Re-run only some sections of a kit and patch them into the stored kit,
+    leaving the other sections and their usage untouched. Sections whose
+    regeneration failed keep their stored content and are listed in failed_sections.
+    """
+    oid = _obj_id(kit_id)
+    with span("mongo.find_one", collection="application_kits"):
+        doc = await db.application_kits.find_one({"_id": oid, "user_id": current_user.id})
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kit not found")
+    chain = doc.get("generation_method") == "chain"
+    kit_sections = CHAIN_SECTIONS if chain else SINGLE_SHOT_SECTIONS
+
+    requested = [part.strip() for part in sections.split(",") if part.strip()] if sections else list(doc.get("stale_sections", []))
+    unknown = [section for section in requested if section not in kit_sections]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sections: {', '.join(unknown)}. Choose from: {', '.join(kit_sections)}"
+        )
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No sections to regenerate")
+    # A single-shot kit is regenerated with one call however many of its sections are requested
+    await llm_limit.charge(current_user.id, response, len(requested) if chain else 1)
+
+    resume = None
+    if not chain or RESUME_DEPENDENT_SECTIONS.intersection(requested):
+        with span("mongo.find_one", collection="resumes"):
+            resume = await db.resumes.find_one({"_id": ObjectId(doc["resume_id"]), "user_id": current_user.id})
+        if not resume:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    resume_digest = await get_resume_digest(resume) if chain and resume else None
+    await attach_job_descriptions([doc])
+
+    with collect_usage() as usage:
+        if chain:
+            regenerated = await run_in_threadpool(
+                generate_sections, resume_digest, doc["job_description"], requested
+            )
+            statuses = {entry["step"]: entry for entry in regenerated["chain_status"]}
+            succeeded = [section for section in requested if statuses[section]["status"] == "success"]
+        else:
+            try:
+                regenerated = await run_in_threadpool(
+                    generate_application_kit_content, full_resume_data(resume), doc["job_description"]
+                )
+                succeeded = [section for section in requested if _usable(regenerated, section)]
+                regenerated["chain_status"] = [{
+                    "step": "kit",
+                    "status": "success" if succeeded else "failed",
+                    "usage": step_usage(usage, "kit")
+                }]
+            except CircuitOpenError as e:
+                regenerated = {"chain_status": [], "retry_after": e.retry_after}
+                succeeded = []
+    usage_flusher.record(current_user.id, usage)
+    if not succeeded and "retry_after" in regenerated:
+        raise _degraded(regenerated["retry_after"])
+    failed = [section for section in requested if section not in succeeded]
+
+    content = await unpack_blob(doc["generated_content"])
+    doc["id"] = str(doc["_id"])
+    if not succeeded:
+        doc["generated_content"] = content
+        doc["failed_sections"] = failed
+        set_etag(response, doc)
+        return stored_response(shape(doc, ApplicationKitOut), response)
+
+    # Merge only the sections that regenerated cleanly; failed ones keep their content, status and stale mark
+    for section in succeeded:
+        content[section] = regenerated[section]
+    replaced = set(succeeded) if chain else {"kit"}
+    new_entries = [entry for entry in regenerated["chain_status"] if entry.get("step") in replaced]
+    content["chain_status"] = sorted(
+        [entry for entry in content.get("chain_status", []) if entry.get("step") not in replaced] + new_entries,
+        key=lambda entry: CHAIN_SECTIONS.index(entry["step"]) if entry.get("step") in CHAIN_SECTIONS else len(CHAIN_SECTIONS)
+    )
+    kit_status = "complete" if all(_usable(content, section) for section in kit_sections) else "degraded"
+    stale = [section for section in doc.get("stale_sections", []) if section not in succeeded]
+    now = datetime.utcnow()
+
+    # The packed content is rewritten whole; matching on updated_at keeps a concurrent patch from being lost
+    with span("mongo.update_one", collection="application_kits"):
+        result = await db.application_kits.update_one(
+            {"_id": oid, "user_id": current_user.id, "updated_at": doc.get("updated_at")},
+            {"$set": {
+                "generated_content": await pack_blob(content),
+                "status": kit_status,
+                "stale_sections": stale,
+                "updated_at": now
+            }}
+        )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Kit was modified concurrently; retry the request")
+    await delete_blob(doc["generated_content"])
+    await index_kit(doc, content, doc["job_description"])
+
+    doc.update({
+        "generated_content": content,
+        "status": kit_status,
+        "stale_sections": stale,
+        "failed_sections": failed,
+        "updated_at": now
+    })
+    set_etag(response, doc)
+    return stored_response(shape(doc, ApplicationKitOut), response)
+
+
+@router.get("/{kit_id}/export.{fmt}")
+async def export_kit(
+    kit_id: str,
+    fmt: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(get_current_user)
+):
+    """
+    Download the cover letter, email and Q&A of a kit as pdf, docx or md.
+    Rendered files are cached by content hash, so repeat downloads skip rendering.
+    """
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unsupported export format. Choose from: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    oid = _obj_id(kit_id)
+    with span("mongo.find_one", collection="application_kits"):
+        doc = await db.application_kits.find_one({"_id": oid, "user_id": current_user.id}, {"generated_content": 1})
+    if not doc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kit not found")
+    title = "Application Kit"
+    sections = export_sections(await unpack_blob(doc.get("generated_content")) or {})
+    if not sections:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kit has no cover letter, email or Q&A to export")
+
+    key = export_key(fmt, title, sections)
+    headers = {
+        "ETag": f'"{key[:32]}"',
+        "Cache-Control": CACHE_CONTROL,
+        "Content-Disposition": f'attachment; filename="application-kit-{kit_id}.{fmt}"'
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    data = await get_cached_export(key, fmt)
+    if data is None:
+        with span("export.render", format=fmt):
+            if fmt == "pdf":
+                pool = get_process_pool("export", settings.EXPORT_WORKER_PROCESSES)
+                try:
+                    data = await run_in_process(pool, render_pdf, render_html(title, sections))
+                except (ImportError, OSError):
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="PDF export is unavailable on this server")
+            elif fmt == "docx":
+                data = render_docx(title, sections)
+            else:
+                data = render_markdown(title, sections)
+        await store_export(key, fmt, data)
+    return Response(content=data, media_type=EXPORT_MEDIA_TYPES[fmt], headers=headers)
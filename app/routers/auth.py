@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from google.auth.transport import requests
-from google.oauth2 import id_token
-from google.auth.exceptions import GoogleAuthError
-from datetime import timedelta
+from datetime import datetime, timedelta
+import logging
 
-from app.core.security import create_access_token, get_current_user
+from app.core.security import create_access_token, decode_token, get_current_user, oauth2_scheme
+from app.core.revocation import revocation_list
 from app.core.config import settings
+from app.core.google_auth import get_google_verifier
 from app.schemas.token import AuthResponse
 from app.schemas.user import UserOut, UserCreate
 from app.crud.user import get_user_by_google_id, create_user
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 GOOGLE_CLIENT_ID = settings.GOOGLE_CLIENT_ID
 
@@ -21,40 +22,26 @@ async def google_login(request: dict):
     Authenticate user with Google ID token
     Expects: {"id_token": "google_id_token_string"}
     """
-    print(f"[DEBUG] Google login request received: {list(request.keys())}")
-    
     try:
         google_id_token = request.get("id_token")
         if not google_id_token:
-            print("[DEBUG] No id_token in request")
+            logger.debug("Google login without id_token")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="ID token is required",
             )
 
-        print(f"[DEBUG] Verifying token with client ID: {GOOGLE_CLIENT_ID}")
-        
         try:
-            # Verify the Google ID token
-            id_info = id_token.verify_oauth2_token(
-                google_id_token, requests.Request(), GOOGLE_CLIENT_ID
-            )
-
-            if id_info["iss"] not in [
-                "accounts.google.com",
-                "https://accounts.google.com",
-            ]:
-                raise ValueError("Wrong issuer")
+            # Verify the Google ID token locally against cached signing keys
+            id_info = await get_google_verifier().verify(google_id_token)
 
             google_id_val = id_info["sub"]
             email = id_info["email"]
             name = id_info.get("name", "")
             picture = id_info.get("picture", "")
             
-            print(f"[DEBUG] Token verified successfully for user: {email}")
-            
         except Exception as e:
-            print(f"[DEBUG] Token verification failed: {e}")
+            logger.info("Google token verification failed", extra={"error": str(e)})
             raise ValueError(f"Invalid Google token: {str(e)}")
 
         # Check if user exists
@@ -95,16 +82,13 @@ async def google_login(request: dict):
             "user": user_out,
         }
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid Google token: {str(e)}",
         )
-    except GoogleAuthError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Google authentication failed: {str(e)}",
-        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -117,8 +101,11 @@ async def read_users_me(current_user = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout():
+async def logout(token: str = Depends(oauth2_scheme)):
     """
-    Logout user (client should delete the token)
+    Logout user by revoking the current token (client should delete it too)
     """
+    payload = decode_token(token)
+    if payload.get("jti"):
+        await revocation_list.revoke(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
     return {"message": "Successfully logged out"}
@@ -1,15 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status, UploadFile, File, Form, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
 from bson import ObjectId
+import asyncio
+import io
+import json
+import os
+import time
+import zipfile
+import zlib
 
 from app.schemas.resume import ResumeCreate, ResumeOut, ResumeUpdate, ResumeCreateFromPDF
+from app.schemas.pagination import Page
+from app.core.blob_storage import delete_blob, pack_blob, unpack_blob
+from app.core.config import settings
 from app.core.database import db
+from app.core.etag import not_modified_response, set_etag
+from app.core.pagination import fetch_page, parse_fields
+from app.core.profiling import run_in_threadpool
+from app.core.rate_limit import RateLimit
+from app.core.responses import stored_response
 from app.core.security import get_current_user
+from app.core.workers import get_process_pool, run_in_process
+from app.core.metrics import PDF_PARSE_SECONDS
+from app.core.tracing import span
+from app.crud.application_kit import mark_resume_kits_stale
+from app.crud.resume import refresh_resume_digest
+from app.crud.search import index_resume, remove_from_index
+from app.crud.parsed_pdf import get_parsed_pdf, get_parsed_pdfs, save_parsed_pdf
 from app.services.pdf_service import PDFParsingService
 
 router = APIRouter()
 
+# Fields left out of list responses unless requested with fields=
+LARGE_RESUME_FIELDS = {"content"}
+
+# Uploads draw from one per-user budget; a batch costs one token per file
+pdf_upload_limit = RateLimit("pdf_upload")
+
 
 def _obj_id(id: str):
     try:
@@ -18,8 +47,33 @@ def _obj_id(id: str):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid resume ID")
 
 
+def _resume_out(doc: dict, include_content: bool = True) -> dict:
+    """Transform a stored resume document to match the ResumeOut schema"""
+    resume_data = {
+        "personal_info": doc.get("personal_info", {}),
+        "education": doc.get("education", []),
+        "skills": doc.get("skills", []),
+        "experience": doc.get("experience", []),
+        "projects": doc.get("projects", [])
+    }
+    if include_content:
+        resume_data = {"content": doc.get("content", ""), **resume_data}
+    return {
+        "id": str(doc["_id"]),
+        "resume_name": doc.get("resume_name", ""),
+        "resume_data": resume_data,
+        "user_id": doc.get("user_id", ""),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at")
+    }
+
+
 @router.post("/", response_model=ResumeOut, status_code=status.HTTP_201_CREATED)
-async def create_resume(resume: ResumeCreate, current_user=Depends(get_current_user)):
+async def create_resume(
+    resume: ResumeCreate,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_user)
+):
     data = resume.model_dump()
     data.update({
         "user_id": current_user.id,
@@ -28,80 +82,86 @@ async def create_resume(resume: ResumeCreate, current_user=Depends(get_current_u
     })
     result = await db.resumes.insert_one(data)
     data["id"] = str(result.inserted_id)
+    await index_resume(data)
+    background_tasks.add_task(refresh_resume_digest, data["id"])
     return data
 
 
-@router.get("/", response_model=List[ResumeOut])
-async def list_resumes(current_user=Depends(get_current_user)):
-    cursor = db.resumes.find({"user_id": current_user.id})
-    resumes = []
-    async for doc in cursor:
-        # Transform the document to match ResumeOut schema
-        resume_data = {
-            "id": str(doc["_id"]),
-            "resume_name": doc.get("resume_name", ""),
-            "resume_data": {
-                "content": doc.get("content", ""),
-                "personal_info": doc.get("personal_info", {}),
-                "education": doc.get("education", []),
-                "skills": doc.get("skills", []),
-                "experience": doc.get("experience", []),
-                "projects": doc.get("projects", [])
-            },
-            "user_id": doc.get("user_id", ""),
-            "created_at": doc.get("created_at"),
-            "updated_at": doc.get("updated_at")
-        }
-        resumes.append(resume_data)
-    return resumes
+@router.get("/", response_model=Page[ResumeOut])
+async def list_resumes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated large fields to include: content"),
+    current_user=Depends(get_current_user)
+):
+    include = parse_fields(fields, LARGE_RESUME_FIELDS)
+    projection = {field: 0 for field in LARGE_RESUME_FIELDS - include}
+    docs, next_token = await fetch_page(db.resumes, {"user_id": current_user.id}, limit, cursor, projection)
+    if "content" in include:
+        for doc in docs:
+            doc["content"] = await unpack_blob(doc.get("content"))
+    return stored_response({
+        "items": [_resume_out(doc, include_content="content" in include) for doc in docs],
+        "next": next_token
+    })
 
 
 @router.get("/{resume_id}", response_model=ResumeOut)
-async def get_resume(resume_id: str, current_user=Depends(get_current_user)):
+async def get_resume(
+    resume_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(get_current_user)
+):
     oid = _obj_id(resume_id)
-    doc = await db.resumes.find_one({"_id": oid, "user_id": current_user.id})
+    query = {"_id": oid, "user_id": current_user.id}
+    not_modified = await not_modified_response(db.resumes, query, if_none_match)
+    if not_modified:
+        return not_modified
+    doc = await db.resumes.find_one(query)
     if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
-    
-    # Transform the document to match ResumeOut schema
-    resume_data = {
-        "id": str(doc["_id"]),
-        "resume_name": doc.get("resume_name", ""),
-        "resume_data": {
-            "content": doc.get("content", ""),
-            "personal_info": doc.get("personal_info", {}),
-            "education": doc.get("education", []),
-            "skills": doc.get("skills", []),
-            "experience": doc.get("experience", []),
-            "projects": doc.get("projects", [])
-        },
-        "user_id": doc.get("user_id", ""),
-        "created_at": doc.get("created_at"),
-        "updated_at": doc.get("updated_at")
-    }
-    return resume_data
+    set_etag(response, doc)
+    doc["content"] = await unpack_blob(doc.get("content"))
+    return stored_response(_resume_out(doc), response)
 
 
 @router.put("/{resume_id}", response_model=ResumeOut)
-async def update_resume(resume_id: str, resume: ResumeUpdate, current_user=Depends(get_current_user)):
+async def update_resume(
+    resume_id: str,
+    resume: ResumeUpdate,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_user)
+):
     oid = _obj_id(resume_id)
     data = {k: v for k, v in resume.dict().items() if v is not None}
     if not data:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields provided for update")
     data["updated_at"] = datetime.utcnow()
-    result = await db.resumes.update_one({"_id": oid, "user_id": current_user.id}, {"$set": data})
+    update = {"$set": data}
+    if "resume_data" in data:
+        # The digest describes the old content; it is rebuilt after the response
+        update["$unset"] = {"digest": ""}
+    result = await db.resumes.update_one({"_id": oid, "user_id": current_user.id}, update)
     if result.modified_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found or no changes made")
+    if "resume_data" in data:
+        await mark_resume_kits_stale(current_user.id, resume_id)
+        background_tasks.add_task(refresh_resume_digest, resume_id)
     doc = await db.resumes.find_one({"_id": oid})
+    await index_resume(doc)
     doc["id"] = str(doc["_id"])
     return doc
 
 
 @router.post("/upload-pdf", response_model=ResumeOut, status_code=status.HTTP_201_CREATED)
 async def upload_resume_pdf(
+    response: Response,
+    background_tasks: BackgroundTasks,
     resume_name: str = Form(...),
     file: UploadFile = File(...),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    rate_limit=Depends(pdf_upload_limit)
 ):
     """Upload and parse a PDF resume file"""
     
@@ -122,56 +182,67 @@ async def upload_resume_pdf(
     try:
         # Read file content
         pdf_content = await file.read()
+        content_hash = PDFParsingService.compute_content_hash(pdf_content)
         
-        # Extract text from PDF
-        text_content = await PDFParsingService.extract_text_from_pdf(pdf_content)
-        
-        if not text_content.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not extract text from PDF. Please ensure the PDF contains readable text."
-            )
+        # Identical upload by the same user resolves to the existing resume
+        with span("mongo.find_one", collection="resumes"):
+            existing = await db.resumes.find_one({"user_id": current_user.id, "content_hash": content_hash})
+        if existing:
+            response.status_code = status.HTTP_200_OK
+            existing["content"] = await unpack_blob(existing.get("content"))
+            return _resume_out(existing)
         
-        # Parse structured data
-        structured_data = PDFParsingService.parse_structured_data(text_content, resume_name)
+        # Reuse a previous parse of the same bytes, skipping extraction and parsing
+        cached = await get_parsed_pdf(content_hash, PDFParsingService.PARSER_VERSION)
+        if cached:
+            text_content = cached["content"]
+            structured_data = cached["structured_data"]
+            structured_data["personal_info"]["name"] = resume_name
+        else:
+            # Extract text from PDF
+            parse_started = time.perf_counter()
+            with span("pdf.extract", size=len(pdf_content)):
+                text_content = await PDFParsingService.extract_text_from_pdf(pdf_content)
+            
+            if not text_content.strip():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Could not extract text from PDF. Please ensure the PDF contains readable text."
+                )
+            
+            # Parse structured data
+            with span("pdf.parse", chars=len(text_content)):
+                structured_data = PDFParsingService.parse_structured_data(text_content, resume_name).model_dump()
+            PDF_PARSE_SECONDS.observe(time.perf_counter() - parse_started)
+            await save_parsed_pdf(content_hash, PDFParsingService.PARSER_VERSION, text_content, structured_data)
         
         # Prepare data for database
         resume_data = {
             "resume_name": resume_name,
-            "content": text_content,
-            "personal_info": structured_data.personal_info.model_dump(),
-            "education": [edu.model_dump() for edu in structured_data.education],
-            "skills": structured_data.skills,
-            "experience": [exp.model_dump() for exp in structured_data.experience],
-            "projects": [proj.model_dump() for proj in structured_data.projects],
+            "content": await pack_blob(text_content),
+            "content_hash": content_hash,
+            "personal_info": structured_data["personal_info"],
+            "education": structured_data["education"],
+            "skills": structured_data["skills"],
+            "experience": structured_data["experience"],
+            "projects": structured_data["projects"],
             "user_id": current_user.id,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
         
         # Save to database
-        result = await db.resumes.insert_one(resume_data)
-        resume_data["id"] = str(result.inserted_id)
-        
-        # Convert to ResumeOut format
-        response_data = {
-            "id": resume_data["id"],
-            "resume_name": resume_data["resume_name"],
-            "resume_data": {
-                "content": resume_data["content"],
-                "personal_info": resume_data["personal_info"],
-                "education": resume_data["education"],
-                "skills": resume_data["skills"],
-                "experience": resume_data["experience"],
-                "projects": resume_data["projects"]
-            },
-            "user_id": resume_data["user_id"],
-            "created_at": resume_data["created_at"],
-            "updated_at": resume_data["updated_at"]
-        }
+        with span("mongo.insert_one", collection="resumes"):
+            result = await db.resumes.insert_one(resume_data)
+        resume_data["_id"] = result.inserted_id
+        resume_data["content"] = text_content
+        await index_resume(resume_data)
+        background_tasks.add_task(refresh_resume_digest, str(result.inserted_id))
         
-        return response_data
+        return _resume_out(resume_data)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -184,10 +255,176 @@ async def upload_resume_pdf(
         )
 
 
+def _plan_batch_entries(filename: str, content_type: str, data: bytes) -> List[Tuple[str, Any, Optional[str], int]]:
+    """
+    List the PDFs in one uploaded file as (filename, source, error, size) without
+    decompressing anything; source is the PDF bytes or a (zip archive, member) pair
+    """
+    max_size = 10 * 1024 * 1024
+    if content_type in ("application/zip", "application/x-zip-compressed") or filename.lower().endswith(".zip"):
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(data))
+        except zipfile.BadZipFile:
+            return [(filename, None, "Invalid zip archive", 0)]
+        entries = []
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                continue
+            if info.file_size > max_size:
+                entries.append((name, None, "File size too large. Maximum 10MB allowed.", 0))
+            else:
+                entries.append((name, (archive, info), None, info.file_size))
+        return entries
+    
+    if content_type != "application/pdf":
+        return [(filename, None, "Only PDF files are allowed", 0)]
+    if len(data) > max_size:
+        return [(filename, None, "File size too large. Maximum 10MB allowed.", 0)]
+    return [(filename, data, None, len(data))]
+
+
+def _read_batch_entries(planned: List[Tuple[str, Any, Optional[str], int]]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Decompress planned zip members into (filename, pdf bytes, error); blocking, so run it in a thread"""
+    entries = []
+    for name, source, error, _ in planned:
+        if error or isinstance(source, bytes):
+            entries.append((name, source, error))
+            continue
+        archive, info = source
+        try:
+            entries.append((name, archive.read(info), None))
+        except (zipfile.BadZipFile, RuntimeError, NotImplementedError, zlib.error) as e:
+            # Bad CRC, truncated data, encrypted or unsupported compression
+            entries.append((name, None, f"Could not read file from zip archive: {e}"))
+    return entries
+
+
+@router.post("/upload-batch")
+async def upload_resume_batch(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    current_user=Depends(get_current_user)
+):
+    """
+    Upload many PDF resumes (or zip archives of PDFs) at once.
+    Streams one JSON line per file with status created, duplicate or failed.
+    """
+    planned = []
+    for file in files:
+        data = await file.read()
+        planned.extend(_plan_batch_entries(file.filename or "upload.pdf", file.content_type, data))
+    
+    # Limits are checked against the zip directories before anything is decompressed
+    if len(planned) > settings.BATCH_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum {settings.BATCH_UPLOAD_MAX_FILES} allowed per batch."
+        )
+    if sum(size for _, _, _, size in planned) > settings.BATCH_UPLOAD_MAX_TOTAL_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large. Maximum {settings.BATCH_UPLOAD_MAX_TOTAL_BYTES // (1024 * 1024)}MB of PDFs allowed per batch."
+        )
+    await pdf_upload_limit.charge(current_user.id, response, cost=len(planned))
+    entries = await run_in_threadpool(_read_batch_entries, planned)
+    
+    async def process_batch():
+        counts = {"created": 0, "duplicate": 0, "failed": 0}
+        
+        def line(filename: str, status_value: str, **extra) -> bytes:
+            counts[status_value] += 1
+            return (json.dumps({"filename": filename, "status": status_value, **extra}) + "\n").encode()
+        
+        hashes = [PDFParsingService.compute_content_hash(data) for _, data, error in entries if data is not None]
+        existing_cursor = db.resumes.find(
+            {"user_id": current_user.id, "content_hash": {"$in": hashes}},
+            {"content_hash": 1}
+        )
+        existing = {doc["content_hash"]: str(doc["_id"]) async for doc in existing_cursor}
+        cached = await get_parsed_pdfs(hashes, PDFParsingService.PARSER_VERSION)
+        
+        async def parse_entry(filename: str, content_hash: str, data: bytes):
+            resume_name = os.path.splitext(os.path.basename(filename))[0]
+            try:
+                if content_hash in cached:
+                    structured_data = cached[content_hash]["structured_data"]
+                    structured_data["personal_info"]["name"] = resume_name
+                    return filename, content_hash, resume_name, cached[content_hash]["content"], structured_data, None
+                pool = get_process_pool("pdf", settings.PDF_WORKER_PROCESSES)
+                with PDF_PARSE_SECONDS.time(), span("pdf.extract_and_parse", filename=filename, size=len(data)):
+                    text_content, structured_data = await run_in_process(
+                        pool, PDFParsingService.extract_and_parse, data, resume_name
+                    )
+                await save_parsed_pdf(content_hash, PDFParsingService.PARSER_VERSION, text_content, structured_data)
+                return filename, content_hash, resume_name, text_content, structured_data, None
+            except Exception as e:
+                return filename, content_hash, resume_name, None, None, str(e)
+        
+        tasks = []
+        seen = set()
+        for filename, data, error in entries:
+            if error:
+                yield line(filename, "failed", reason=error)
+                continue
+            content_hash = PDFParsingService.compute_content_hash(data)
+            if content_hash in existing:
+                yield line(filename, "duplicate", id=existing[content_hash])
+                continue
+            if content_hash in seen:
+                yield line(filename, "duplicate", reason="Same file appears earlier in this batch")
+                continue
+            seen.add(content_hash)
+            tasks.append(asyncio.ensure_future(parse_entry(filename, content_hash, data)))
+        
+        docs = []
+        for next_done in asyncio.as_completed(tasks):
+            filename, content_hash, resume_name, text_content, structured_data, error = await next_done
+            if error:
+                yield line(filename, "failed", reason=error)
+                continue
+            now = datetime.utcnow()
+            docs.append((filename, {
+                "resume_name": resume_name,
+                "content": await pack_blob(text_content),
+                "content_hash": content_hash,
+                "personal_info": structured_data["personal_info"],
+                "education": structured_data["education"],
+                "skills": structured_data["skills"],
+                "experience": structured_data["experience"],
+                "projects": structured_data["projects"],
+                "user_id": current_user.id,
+                "created_at": now,
+                "updated_at": now
+            }))
+        
+        if docs:
+            try:
+                result = await db.resumes.insert_many([doc for _, doc in docs])
+            except Exception as e:
+                for filename, _ in docs:
+                    yield line(filename, "failed", reason=f"Database insert failed: {str(e)}")
+            else:
+                for (filename, doc), inserted_id in zip(docs, result.inserted_ids):
+                    yield line(filename, "created", id=str(inserted_id))
+                    await index_resume({**doc, "_id": inserted_id})
+                    background_tasks.add_task(refresh_resume_digest, str(inserted_id))
+        
+        yield (json.dumps({"status": "complete", **counts}) + "\n").encode()
+    
+    # Digests of the created resumes are built once the stream has finished
+    return StreamingResponse(
+        process_batch(), media_type="application/x-ndjson", headers=dict(response.headers), background=background_tasks
+    )
+
+
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_resume(resume_id: str, current_user=Depends(get_current_user)):
     oid = _obj_id(resume_id)
-    result = await db.resumes.delete_one({"_id": oid, "user_id": current_user.id})
-    if result.deleted_count == 0:
+    doc = await db.resumes.find_one_and_delete({"_id": oid, "user_id": current_user.id}, projection={"content": 1})
+    if not doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    await delete_blob(doc.get("content"))
+    await remove_from_index("resume", resume_id)
     return None
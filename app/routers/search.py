@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
+
+from app.schemas.search import SearchResponse
+from app.core.security import get_current_user
+from app.crud.search import search_documents
+
+router = APIRouter()
+
+SEARCH_KINDS = {"resume", "kit", "analysis"}
+
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None, description="Comma-separated kinds to search: resume, kit, analysis"),
+    limit: int = Query(20, ge=1, le=50),
+    current_user=Depends(get_current_user)
+):
+    """
+    Full-text search over the current user's resumes, kits and analyses.
+    Returns ranked matches with a snippet each; fetch the document itself by id.
+    """
+    kinds = [part.strip() for part in kind.split(",") if part.strip()] if kind else None
+    if kinds and not SEARCH_KINDS.issuperset(kinds):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown kind. Choose from: {', '.join(sorted(SEARCH_KINDS))}"
+        )
+    return {"items": await search_documents(current_user.id, q, kinds, limit)}
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.schemas.usage import UsageSummary
+from app.core.security import get_current_user
+from app.crud.usage import get_usage_summary, usage_flusher
+
+router = APIRouter()
+
+
+@router.get("/", response_model=UsageSummary)
+async def read_usage(
+    days: int = Query(30, ge=1, le=365),
+    current_user=Depends(get_current_user)
+):
+    """
+    LLM token usage and estimated cost of the current user, per section
+    """
+    # Include this worker's not-yet-flushed usage
+    await usage_flusher.flush()
+    return await get_usage_summary(current_user.id, days)
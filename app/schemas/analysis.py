@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 
@@ -13,12 +13,29 @@ class AnalysisOut(BaseModel):
     id: str
     user_id: str
     resume_id: str
+    job_description_id: Optional[str] = None
     job_description: str
     experience_level: str
     score: int
     keywords_found: List[str]
     keywords_missing: List[str]
+    chain_status: Optional[List[Dict[str, Any]]] = None
+    status: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class AnalysisSummary(BaseModel):
+    id: str
+    user_id: str
+    resume_id: str
+    job_description_id: Optional[str] = None
+    experience_level: str
+    score: int
+    keywords_found: List[str]
+    keywords_missing: List[str]
+    status: Optional[str] = None
+    created_at: datetime
+    job_description: Optional[str] = None
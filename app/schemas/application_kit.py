@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
@@ -15,8 +15,27 @@ class ApplicationKitCreate(ApplicationKitBase):
 class ApplicationKitOut(ApplicationKitBase):
     id: str
     user_id: str
+    job_description_id: Optional[str] = None
     created_at: datetime
     generated_content: Dict[str, Any]
+    status: Optional[str] = None
+    stale_sections: List[str] = []
+    updated_at: Optional[datetime] = None
+    # Sections a regenerate request could not produce; their stored content was kept
+    failed_sections: Optional[List[str]] = None
 
     class Config:
         from_attributes = True
+
+
+class ApplicationKitSummary(BaseModel):
+    id: str
+    user_id: str
+    resume_id: str
+    job_description_id: Optional[str] = None
+    created_at: datetime
+    generation_method: Optional[str] = None
+    status: Optional[str] = None
+    stale_sections: Optional[List[str]] = None
+    job_description: Optional[str] = None
+    generated_content: Optional[Dict[str, Any]] = None
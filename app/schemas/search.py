@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+
+class SearchResult(BaseModel):
+    kind: str
+    id: str
+    title: str
+    snippet: str
+    score: float
+    created_at: datetime
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class UsageCounts(BaseModel):
+    calls: int
+    errors: int
+    cached_calls: int
+    prompt_tokens: int
+    output_tokens: int
+    latency_ms: int
+    estimated_cost: float
+
+
+class SectionUsage(UsageCounts):
+    section: str
+
+
+class UsageSummary(BaseModel):
+    user_id: str
+    since: str
+    totals: UsageCounts
+    sections: List[SectionUsage]
@@ -1,18 +1,130 @@
-import google.generativeai as genai
 import json
+import logging
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Optional, Any
+from app.core.circuit_breaker import CircuitOpenError, get_breaker
 from app.core.config import settings
+from app.core.metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from app.core.tracing import span
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+# The Gemini SDK is slow to import; it is loaded and configured on the first LLM call
+_genai = None
 
-def generate_text(prompt: str) -> str:
+
+def _get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        _genai = genai
+    return _genai
+
+logger = logging.getLogger(__name__)
+
+# Usage records of the LLM calls made in the current context, see collect_usage()
+_usage_records: ContextVar[Optional[List[dict]]] = ContextVar("llm_usage_records", default=None)
+
+
+@contextmanager
+def collect_usage():
+    """
+    Collect a usage record for every LLM call made inside the block.
+    Nested blocks share the outermost list.
+    """
+    records = _usage_records.get()
+    if records is not None:
+        yield records
+        return
+    records = []
+    token = _usage_records.set(records)
+    try:
+        yield records
+    finally:
+        _usage_records.reset(token)
+
+
+def _record_usage(step: str, model_name: str, started: float, response, status: str) -> Optional[dict]:
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = (getattr(usage, "prompt_token_count", 0) or 0) if usage is not None else 0
+    output_tokens = (getattr(usage, "candidates_token_count", 0) or 0) if usage is not None else 0
+    cached_tokens = (getattr(usage, "cached_content_token_count", 0) or 0) if usage is not None else 0
+    LLM_TOKENS.labels(step, model_name, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(step, model_name, "completion").inc(output_tokens)
+    record = {
+        "step": step,
+        "model": model_name,
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "latency_ms": round((time.perf_counter() - started) * 1000),
+        "cached": cached_tokens > 0,
+        "status": status
+    }
+    records = _usage_records.get()
+    if records is not None:
+        records.append(record)
+    return record
+
+
+def step_usage(records: List[dict], step: str) -> Optional[dict]:
+    """Combine the usage records of one step (a step may retry) into a chain_status entry"""
+    step_records = [r for r in records if r["step"] == step]
+    if not step_records:
+        return None
+    return {
+        "model": step_records[-1]["model"],
+        "calls": len(step_records),
+        "errors": sum(r["status"] != "success" for r in step_records),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in step_records),
+        "output_tokens": sum(r["output_tokens"] for r in step_records),
+        "latency_ms": sum(r["latency_ms"] for r in step_records),
+        "cached": all(r["cached"] for r in step_records)
+    }
+
+
+def generate_text(prompt: str, step: str = "generic") -> str:
     """
     Generates text using the configured Gemini model.
+    `step` labels the call's metrics and usage record.
     """
-    model = genai.GenerativeModel(settings.LLM_MODEL)
-    response = model.generate_content(prompt)
-    return response.text
+    model_name = settings.LLM_MODEL
+    breaker = get_breaker(model_name)
+    # Built before taking a half-open probe slot: if the SDK import or setup
+    # raises, no outcome would be recorded and the probe would never be released
+    model = _get_genai().GenerativeModel(model_name)
+    # Fails fast with CircuitOpenError while the model is unhealthy
+    breaker.before_call()
+    with span("llm.generate", step=step, model=model_name) as llm_span:
+        start = time.perf_counter()
+        try:
+            response = model.generate_content(prompt)
+            text = response.text
+        except Exception:
+            LLM_ERRORS.labels(step, model_name).inc()
+            _record_usage(step, model_name, start, None, "error")
+            breaker.record(False, time.perf_counter() - start)
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(step, model_name).observe(time.perf_counter() - start)
+        breaker.record(True, time.perf_counter() - start)
+        record = _record_usage(step, model_name, start, response, "success")
+        llm_span.set_attribute("prompt_tokens", record["prompt_tokens"])
+        llm_span.set_attribute("output_tokens", record["output_tokens"])
+        llm_span.set_attribute("cached", record["cached"])
+    return text
+
+def _step_status(records: List[dict], step: str) -> str:
+    """"failed" when every LLM call of a step errored, so its placeholder text is not reused"""
+    usage = step_usage(records, step)
+    if usage and usage["errors"] == usage["calls"]:
+        return "failed"
+    return "success"
+
+
+# Sections produced by the chain, in generation order
+CHAIN_SECTIONS = ["email", "cover_letter", "q_and_a", "dsa", "experiences", "playlists"]
+
 
 def generate_application_kit_content_chain(resume_data: dict, job_description: str) -> dict:
     """
@@ -32,53 +144,63 @@ def generate_application_kit_content_chain(resume_data: dict, job_description: s
     
     start_time = time.time()
     
-    try:
-        # Step 1: Generate Email
-        print("🔗 Chain Step 1: Generating Email...")
-        email_result = _generate_email(resume_data, job_description)
-        result["email"] = email_result
-        result["chain_status"].append({"step": "email", "status": "success", "length": len(email_result) if email_result else 0})
+    with collect_usage() as usage, span("ai.kit_chain"):
+        try:
+            # Step 1: Generate Email
+            logger.debug("Chain step started", extra={"step": "email", "step_number": 1})
+            email_result = _generate_email(resume_data, job_description)
+            result["email"] = email_result
+            result["chain_status"].append({"step": "email", "status": _step_status(usage, "email"), "length": len(email_result) if email_result else 0, "usage": step_usage(usage, "email")})
         
-        # Step 2: Generate Cover Letter
-        print("🔗 Chain Step 2: Generating Cover Letter...")
-        cover_letter_result = _generate_cover_letter(resume_data, job_description)
-        result["cover_letter"] = cover_letter_result
-        result["chain_status"].append({"step": "cover_letter", "status": "success", "length": len(cover_letter_result) if cover_letter_result else 0})
+            # Step 2: Generate Cover Letter
+            logger.debug("Chain step started", extra={"step": "cover_letter", "step_number": 2})
+            cover_letter_result = _generate_cover_letter(resume_data, job_description)
+            result["cover_letter"] = cover_letter_result
+            result["chain_status"].append({"step": "cover_letter", "status": _step_status(usage, "cover_letter"), "length": len(cover_letter_result) if cover_letter_result else 0, "usage": step_usage(usage, "cover_letter")})
         
-        # Step 3: Generate Q&A
-        print("🔗 Chain Step 3: Generating Q&A...")
-        qa_result = _generate_qa(resume_data, job_description)
-        result["q_and_a"] = qa_result
-        result["chain_status"].append({"step": "q_and_a", "status": "success", "count": len(qa_result) if qa_result else 0})
+            # Step 3: Generate Q&A
+            logger.debug("Chain step started", extra={"step": "q_and_a", "step_number": 3})
+            qa_result = _generate_qa(resume_data, job_description)
+            result["q_and_a"] = qa_result
+            result["chain_status"].append({"step": "q_and_a", "status": _step_status(usage, "q_and_a"), "count": len(qa_result) if qa_result else 0, "usage": step_usage(usage, "q_and_a")})
         
-        # Step 4: Generate DSA
-        print("🔗 Chain Step 4: Generating DSA Topics...")
-        dsa_result = _generate_dsa(job_description)
-        result["dsa"] = dsa_result
-        result["chain_status"].append({"step": "dsa", "status": "success", "count": len(dsa_result.get("topics", [])) if dsa_result else 0})
+            # Step 4: Generate DSA
+            logger.debug("Chain step started", extra={"step": "dsa", "step_number": 4})
+            dsa_result = _generate_dsa(job_description)
+            result["dsa"] = dsa_result
+            result["chain_status"].append({"step": "dsa", "status": _step_status(usage, "dsa"), "count": len(dsa_result.get("topics", [])) if dsa_result else 0, "usage": step_usage(usage, "dsa")})
         
-        # Step 5: Generate Experiences
-        print("🔗 Chain Step 5: Generating Interview Experiences...")
-        experiences_result = _generate_experiences(job_description)
-        result["experiences"] = experiences_result
-        result["chain_status"].append({"step": "experiences", "status": "success", "count": len(experiences_result) if experiences_result else 0})
+            # Step 5: Generate Experiences
+            logger.debug("Chain step started", extra={"step": "experiences", "step_number": 5})
+            experiences_result = _generate_experiences(job_description)
+            result["experiences"] = experiences_result
+            result["chain_status"].append({"step": "experiences", "status": _step_status(usage, "experiences"), "count": len(experiences_result) if experiences_result else 0, "usage": step_usage(usage, "experiences")})
         
-        # Step 6: Generate Playlists/YouTube Links
-        print("🔗 Chain Step 6: Generating YouTube Playlists...")
-        playlists_result = _generate_playlists(job_description)
-        result["playlists"] = playlists_result
-        result["chain_status"].append({"step": "playlists", "status": "success", "count": len(playlists_result) if playlists_result else 0})
+            # Step 6: Generate Playlists/YouTube Links
+            logger.debug("Chain step started", extra={"step": "playlists", "step_number": 6})
+            playlists_result = _generate_playlists(job_description)
+            result["playlists"] = playlists_result
+            result["chain_status"].append({"step": "playlists", "status": _step_status(usage, "playlists"), "count": len(playlists_result) if playlists_result else 0, "usage": step_usage(usage, "playlists")})
         
-        result["generation_time"] = round(time.time() - start_time, 2)
-        print(f"✅ Chain completed successfully in {result['generation_time']} seconds")
+            result["generation_time"] = round(time.time() - start_time, 2)
+            logger.info("Chain completed", extra={"generation_time": result["generation_time"]})
         
-        return result
+            return result
         
-    except Exception as e:
-        result["chain_status"].append({"step": "error", "status": "failed", "error": str(e)})
-        result["generation_time"] = round(time.time() - start_time, 2)
-        print(f"❌ Chain failed: {str(e)}")
-        return result
+        except CircuitOpenError as e:
+            # Skip the remaining steps at once; the caller fills them from cache where it can
+            for section in CHAIN_SECTIONS:
+                if result[section] is None:
+                    result["chain_status"].append({"step": section, "status": "skipped", "reason": "circuit_open"})
+            result["generation_time"] = round(time.time() - start_time, 2)
+            logger.warning("Chain short-circuited", extra={"error": str(e), "generation_time": result["generation_time"]})
+            return result
+        
+        except Exception as e:
+            result["chain_status"].append({"step": "error", "status": "failed", "error": str(e)})
+            result["generation_time"] = round(time.time() - start_time, 2)
+            logger.warning("Chain failed", extra={"error": str(e), "generation_time": result["generation_time"]})
+            return result
 
 def _generate_email(resume_data: dict, job_description: str) -> str:
     """Generate tailored email"""
@@ -103,12 +225,14 @@ def _generate_email(resume_data: dict, job_description: str) -> str:
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="email")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result.get("email", "Error generating email")
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Email generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "email", "error": str(e)})
         return f"Error generating email: {str(e)}"
 
 
@@ -135,12 +259,14 @@ def _generate_cover_letter(resume_data: dict, job_description: str) -> str:
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="cover_letter")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result.get("cover_letter", "Error generating cover letter")
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Cover letter generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "cover_letter", "error": str(e)})
         return f"Error generating cover letter: {str(e)}"
 
 
@@ -166,12 +292,14 @@ def _generate_qa(resume_data: dict, job_description: str) -> List[Dict[str, str]
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="q_and_a")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result.get("q_and_a", [])
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Q&A generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "q_and_a", "error": str(e)})
         return [{"question": "Error", "answer": f"Error generating Q&A: {str(e)}"}]
 
 
@@ -200,12 +328,14 @@ def _generate_dsa(job_description: str) -> Dict[str, Any]:
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="dsa")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"DSA generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "dsa", "error": str(e)})
         return {
             "topics": ["Error"],
             "suggested_problems": [{"question": "Error", "approach": f"Error generating DSA: {str(e)}", "practice_link": "#"}]
@@ -232,12 +362,14 @@ def _generate_experiences(job_description: str) -> List[Dict[str, str]]:
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="experiences")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result.get("experiences", [])
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Experiences generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "experiences", "error": str(e)})
         return [{"title": "Error", "link": f"Error generating experiences: {str(e)}"}]
 
 
@@ -262,15 +394,56 @@ def _generate_playlists(job_description: str) -> List[Dict[str, str]]:
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="playlists")
         cleaned_text = _clean_response(generated_text)
         result = json.loads(cleaned_text)
         return result.get("playlists", [])
+    except CircuitOpenError:
+        raise
     except Exception as e:
-        print(f"Playlists generation error: {e}")
+        logger.warning("Chain step failed", extra={"step": "playlists", "error": str(e)})
         return [{"title": "Error", "channel": "Error", "link": f"Error generating playlists: {str(e)}"}]
 
 
+# Chain section generators; resume-dependent ones take (resume_data, job_description), the rest the JD only
+SECTION_GENERATORS = {
+    "email": _generate_email,
+    "cover_letter": _generate_cover_letter,
+    "q_and_a": _generate_qa,
+    "dsa": _generate_dsa,
+    "experiences": _generate_experiences,
+    "playlists": _generate_playlists,
+}
+# Sections that go stale when the resume they were written from changes
+RESUME_DEPENDENT_SECTIONS = {"email", "cover_letter", "q_and_a"}
+
+
+def generate_sections(resume_data: dict, job_description: str, sections: List[str]) -> dict:
+    """
+    Re-run only the given chain sections, in chain order.
+    Returns the new section values plus their chain_status entries; if the
+    circuit opens part-way, sections already generated are kept and the rest
+    are marked skipped.
+    """
+    result = {"chain_status": []}
+    ordered = [section for section in CHAIN_SECTIONS if section in sections]
+    with collect_usage() as usage, span("ai.regenerate", sections=",".join(sections)):
+        for i, section in enumerate(ordered):
+            generator = SECTION_GENERATORS[section]
+            try:
+                if section in RESUME_DEPENDENT_SECTIONS:
+                    result[section] = generator(resume_data, job_description)
+                else:
+                    result[section] = generator(job_description)
+            except CircuitOpenError as e:
+                for skipped in ordered[i:]:
+                    result["chain_status"].append({"step": skipped, "status": "skipped", "reason": "circuit_open"})
+                result["retry_after"] = e.retry_after
+                break
+            result["chain_status"].append({"step": section, "status": _step_status(usage, section), "usage": step_usage(usage, section)})
+    return result
+
+
 def _clean_response(generated_text: str) -> str:
     """Clean AI response by removing markdown formatting"""
     cleaned_text = generated_text.strip()
@@ -301,19 +474,20 @@ def generate_application_kit_content(resume_data: dict, job_description: str) ->
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="kit")
         cleaned_text = _clean_response(generated_text)
         return json.loads(cleaned_text)
         
+    except CircuitOpenError:
+        raise
     except json.JSONDecodeError as e:
-        print(f"JSON Parse Error: {e}")
-        print(f"Raw response: {generated_text[:200]}...")
+        logger.warning("Could not parse LLM response as JSON", extra={"error": str(e), "raw_response": generated_text[:200]})
         return {
             "tailored_resume": "Error: Could not parse AI response as JSON",
             "cover_letter": generated_text[:500] + "..." if len(generated_text) > 500 else generated_text
         }
     except Exception as e:
-        print(f"Generation Error: {e}")
+        logger.warning("Kit generation failed", extra={"error": str(e)})
         return {"tailored_resume": "Error generating resume.", "cover_letter": "Error generating cover letter."}
 
 
@@ -339,7 +513,7 @@ def analyze_resume_content(resume_data: dict, job_description: str, experience_l
     """
     
     try:
-        generated_text = generate_text(prompt)
+        generated_text = generate_text(prompt, step="analysis")
         
         # Clean the response - remove any markdown code blocks
         cleaned_text = generated_text.strip()
@@ -363,14 +537,15 @@ def analyze_resume_content(resume_data: dict, job_description: str, experience_l
             "keywords_missing": list(result.get("keywords_missing", []))
         }
         
+    except CircuitOpenError:
+        raise
     except json.JSONDecodeError as e:
-        print(f"JSON Parse Error: {e}")
-        print(f"Raw response: {generated_text[:200]}...")
+        logger.warning("Could not parse LLM response as JSON", extra={"error": str(e), "raw_response": generated_text[:200]})
         return {
             "score": 0, 
             "keywords_found": [], 
             "keywords_missing": [f"Error parsing analysis: {str(e)}"]
         }
     except Exception as e:
-        print(f"Analysis Error: {e}")
+        logger.warning("Analysis failed", extra={"error": str(e)})
         return {"score": 0, "keywords_found": [], "keywords_missing": [f"Error: {str(e)}"]}
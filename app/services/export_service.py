@@ -0,0 +1,148 @@
+import hashlib
+import html
+import io
+import json
+import re
+import zipfile
+from typing import List, Tuple
+
+# Bump when rendering changes so cached exports are not reused
+EXPORT_VERSION = 1
+
+EXPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "md": "text/markdown; charset=utf-8",
+}
+
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+_PDF_STYLE = """
+@page { size: A4; margin: 2cm; }
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 11pt; line-height: 1.45; color: #222; }
+h1 { font-size: 18pt; margin-bottom: 0.2em; }
+h2 { font-size: 14pt; border-bottom: 1px solid #ccc; padding-bottom: 0.1em; margin-top: 1.4em; }
+h3 { font-size: 11pt; margin-bottom: 0.2em; }
+"""
+
+
+def export_sections(content: dict) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    The exportable parts of a kit's generated content as (heading, blocks), where
+    each block is ("p", text) or ("q", text); sections with no content are left out
+    """
+    sections = []
+    for key, heading in (("cover_letter", "Cover Letter"), ("email", "Email")):
+        text = content.get(key)
+        if isinstance(text, str) and text.strip():
+            sections.append((heading, [("p", part.strip()) for part in text.split("\n\n") if part.strip()]))
+    qa = content.get("q_and_a")
+    if isinstance(qa, list) and qa:
+        blocks = []
+        for item in qa:
+            if not isinstance(item, dict):
+                continue
+            question = item.get("question") or item.get("q") or ""
+            answer = item.get("answer") or item.get("a") or ""
+            if question:
+                blocks.append(("q", str(question)))
+            blocks.extend(("p", part.strip()) for part in str(answer).split("\n\n") if part.strip())
+        if blocks:
+            sections.append(("Interview Q&A", blocks))
+    return sections
+
+
+def export_key(fmt: str, title: str, sections: list) -> str:
+    """Cache key of an export: the same content in the same format renders to the same bytes"""
+    raw = json.dumps([EXPORT_VERSION, fmt, title, sections], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def render_markdown(title: str, sections: list) -> bytes:
+    lines = [f"# {title}", ""]
+    for heading, blocks in sections:
+        lines += [f"## {heading}", ""]
+        for kind, text in blocks:
+            lines += [f"### {text}" if kind == "q" else text, ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+def _html_inline(text: str) -> str:
+    return _BOLD_RE.sub(r"<strong>\1</strong>", html.escape(text)).replace("\n", "<br>")
+
+
+def render_html(title: str, sections: list) -> str:
+    parts = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><style>{_PDF_STYLE}</style></head><body>"]
+    parts.append(f"<h1>{html.escape(title)}</h1>")
+    for heading, blocks in sections:
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        for kind, text in blocks:
+            parts.append(f"<h3>{_html_inline(text)}</h3>" if kind == "q" else f"<p>{_html_inline(text)}</p>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def render_pdf(document: str) -> bytes:
+    """Render HTML to PDF with WeasyPrint; CPU-heavy, so run it in a process pool"""
+    from weasyprint import HTML
+
+    return HTML(string=document).write_pdf()
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+# Font sizes in half-points
+_DOCX_SIZES = {"title": 36, "heading": 28, "q": 22}
+
+
+def _docx_runs(text: str, bold: bool = False, size: int = 22) -> str:
+    runs = []
+    for i, part in enumerate(_BOLD_RE.split(text)):
+        if not part:
+            continue
+        props = f'<w:sz w:val="{size}"/>'
+        if bold or i % 2 == 1:
+            props = "<w:b/>" + props
+        lines = html.escape(part, quote=False).split("\n")
+        body = "<w:br/>".join(f'<w:t xml:space="preserve">{line}</w:t>' for line in lines)
+        runs.append(f"<w:r><w:rPr>{props}</w:rPr>{body}</w:r>")
+    return "".join(runs)
+
+
+def _docx_paragraph(text: str, bold: bool = False, size: int = 22) -> str:
+    return f'<w:p><w:pPr><w:spacing w:after="160"/></w:pPr>{_docx_runs(text, bold, size)}</w:p>'
+
+
+def render_docx(title: str, sections: list) -> bytes:
+    """A minimal WordprocessingML document: headings and paragraphs, no styles part needed"""
+    body = [_docx_paragraph(title, True, _DOCX_SIZES["title"])]
+    for heading, blocks in sections:
+        body.append(_docx_paragraph(heading, True, _DOCX_SIZES["heading"]))
+        for kind, text in blocks:
+            body.append(_docx_paragraph(text, kind == "q", _DOCX_SIZES["q"]))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}<w:sectPr/></w:body></w:document>'
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", _DOCX_RELS)
+        docx.writestr("word/document.xml", document)
+    return buf.getvalue()
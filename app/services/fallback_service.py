@@ -0,0 +1,27 @@
+import json
+from typing import List, Optional
+
+from app.services.job_description_service import extract_skills
+
+
+def resume_text(resume: dict, content: Optional[str] = None) -> str:
+    """Plain text to match against: the extracted PDF text plus any structured resume fields"""
+    parts = [content or ""]
+    if resume.get("resume_data"):
+        parts.append(json.dumps(resume["resume_data"], default=str))
+    for key in ("skills", "experience", "projects"):
+        if resume.get(key):
+            parts.append(json.dumps(resume[key], default=str))
+    return "\n".join(parts)
+
+
+def heuristic_analysis(text: str, jd_skills: List[str]) -> dict:
+    """
+    Keyword-overlap analysis used while the LLM is unavailable: the share of the
+    job description's known skills that the resume mentions
+    """
+    resume_skills = set(extract_skills(text))
+    found = [skill for skill in jd_skills if skill in resume_skills]
+    missing = [skill for skill in jd_skills if skill not in resume_skills]
+    score = round(100 * len(found) / len(jd_skills)) if jd_skills else 0
+    return {"score": score, "keywords_found": found, "keywords_missing": missing}
@@ -0,0 +1,54 @@
+import hashlib
+import math
+import re
+from typing import List
+
+# Common skills looked for in job descriptions; matched case-insensitively on word boundaries
+SKILL_VOCABULARY = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Golang", "Rust", "C++", "C#", "Ruby", "PHP",
+    "Kotlin", "Swift", "Scala", "SQL", "NoSQL", "HTML", "CSS", "React", "Angular", "Vue", "Next.js",
+    "Node.js", "Express", "Django", "Flask", "FastAPI", "Spring", "Spring Boot", ".NET", "Rails",
+    "GraphQL", "REST", "gRPC", "Microservices", "MongoDB", "PostgreSQL", "MySQL", "Redis",
+    "Elasticsearch", "Kafka", "RabbitMQ", "Spark", "Hadoop", "Airflow", "AWS", "Azure", "GCP",
+    "Docker", "Kubernetes", "Terraform", "Ansible", "CI/CD", "Jenkins", "GitHub Actions", "Git",
+    "Linux", "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "PyTorch", "TensorFlow",
+    "Pandas", "NumPy", "scikit-learn", "LLM", "Data Structures", "Algorithms", "System Design",
+    "Distributed Systems", "Agile", "Scrum", "Unit Testing", "Selenium", "Figma",
+]
+
+_SKILL_RE = re.compile(
+    r"(?<![\w.+#])(" + "|".join(
+        re.escape(skill) for skill in sorted(SKILL_VOCABULARY, key=len, reverse=True)
+    ) + r")(?![\w+#])",
+    re.IGNORECASE
+)
+_CANONICAL_SKILL = {skill.lower(): skill for skill in SKILL_VOCABULARY}
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v ]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalize_job_description(text: str) -> str:
+    """Normalize line endings and whitespace so trivially different copies share one hash"""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def job_description_hash(cleaned_text: str) -> str:
+    """Canonical key of a normalized job description"""
+    return hashlib.sha256(cleaned_text.encode("utf-8")).hexdigest()
+
+
+def extract_skills(text: str) -> List[str]:
+    """Extract known skills mentioned in the text, in order of first appearance"""
+    skills = []
+    for match in _SKILL_RE.finditer(text):
+        skill = _CANONICAL_SKILL[match.group(1).lower()]
+        if skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+def estimate_token_count(text: str) -> int:
+    """Rough LLM token estimate (about four characters per token) without a network call"""
+    return math.ceil(len(text) / 4)
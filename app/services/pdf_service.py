@@ -1,16 +1,69 @@
 import io
 import re
-from typing import List, Dict, Any
-from pypdf import PdfReader
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from ..schemas.resume import StructuredResumeData, PersonalInfo, Education, Experience, Project
 
 
+# Section header keywords in priority order: when a line mentions several
+# sections, the one listed first wins
+_SECTION_KEYWORDS = [
+    ('personal', ['personal information', 'contact', 'personal details']),
+    ('education', ['education', 'academic', 'qualifications']),
+    ('experience', ['experience', 'work history', 'employment', 'professional experience']),
+    ('skills', ['skills', 'technical skills', 'competencies']),
+    ('projects', ['projects', 'personal projects', 'portfolio']),
+    ('summary', ['summary', 'objective', 'profile']),
+]
+_SECTION_PRIORITY = {section: index for index, (section, _) in enumerate(_SECTION_KEYWORDS)}
+_SECTION_BY_KEYWORD = {keyword: section for section, keywords in _SECTION_KEYWORDS for keyword in keywords}
+
+
+def _keyword_alternation(keywords: List[str]) -> str:
+    """Build a regex alternation grouped by first character, longest keyword first.
+
+    A plain literal alternation (no named groups) keeps the regex engine's
+    prefix optimisations, which matters because every line is scanned.
+    """
+    by_first: Dict[str, List[str]] = {}
+    for keyword in sorted(keywords, key=len, reverse=True):
+        by_first.setdefault(keyword[0], []).append(keyword)
+    return '|'.join(
+        f"{re.escape(first)}(?:{'|'.join(re.escape(keyword[1:]) for keyword in group)})"
+        for first, group in by_first.items()
+    )
+
+
+# One combined alternation over all section keywords, matched against the lowercased line
+_SECTION_RE = re.compile(_keyword_alternation(list(_SECTION_BY_KEYWORD)))
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_LOCATION_RE = re.compile(r'address:|location:|city:')
+_DEGREE_RE = re.compile(r'bachelor|master|phd|degree|diploma|certificate')
+_PROJECT_TECH_RE = re.compile(r'built|using|technology|stack')
+_SKILL_DELIMITERS = [',', '•', '|', ';']
+
+
 class PDFParsingService:
     """Service for parsing PDF resumes and extracting structured data"""
+
+    # Bump when parsing rules change so cached parses are not reused
+    PARSER_VERSION = 1
+
+    @staticmethod
+    def compute_content_hash(pdf_content: bytes) -> str:
+        """Compute the SHA-256 hex digest of the raw PDF bytes"""
+        return hashlib.sha256(pdf_content).hexdigest()
     
     @staticmethod
     async def extract_text_from_pdf(pdf_content: bytes) -> str:
         """Extract text content from PDF file"""
+        return PDFParsingService._extract_text(pdf_content)
+    
+    @staticmethod
+    def _extract_text(pdf_content: bytes) -> str:
+        """Extract text content from PDF bytes (synchronous, safe to run in a worker process)"""
+        from pypdf import PdfReader  # imported on first use to keep app startup light
         try:
             pdf_file = io.BytesIO(pdf_content)
             reader = PdfReader(pdf_file)
@@ -25,6 +78,15 @@ class PDFParsingService:
         except Exception as e:
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
     
+    @staticmethod
+    def extract_and_parse(pdf_content: bytes, resume_name: str) -> Tuple[str, Dict[str, Any]]:
+        """Extract text and parse it into a plain dict, for use from a process pool"""
+        text_content = PDFParsingService._extract_text(pdf_content)
+        if not text_content.strip():
+            raise ValueError("Could not extract text from PDF. Please ensure the PDF contains readable text.")
+        structured_data = PDFParsingService.parse_structured_data(text_content, resume_name)
+        return text_content, structured_data.model_dump()
+    
     @staticmethod
     def parse_structured_data(text_content: str, resume_name: str) -> StructuredResumeData:
         """Parse text content into structured resume data"""
@@ -42,21 +104,10 @@ class PDFParsingService:
         current_item = {}
         
         for line in lines:
-            line_lower = line.lower()
-            
             # Detect sections
-            if any(keyword in line_lower for keyword in ['personal information', 'contact', 'personal details']):
-                current_section = 'personal'
-            elif any(keyword in line_lower for keyword in ['education', 'academic', 'qualifications']):
-                current_section = 'education'
-            elif any(keyword in line_lower for keyword in ['experience', 'work history', 'employment', 'professional experience']):
-                current_section = 'experience'
-            elif any(keyword in line_lower for keyword in ['skills', 'technical skills', 'competencies']):
-                current_section = 'skills'
-            elif any(keyword in line_lower for keyword in ['projects', 'personal projects', 'portfolio']):
-                current_section = 'projects'
-            elif any(keyword in line_lower for keyword in ['summary', 'objective', 'profile']):
-                current_section = 'summary'
+            section = PDFParsingService._classify_section(line)
+            if section:
+                current_section = section
             
             # Parse content based on section
             if current_section == 'personal':
@@ -98,27 +149,35 @@ class PDFParsingService:
             projects=projects
         )
     
+    @staticmethod
+    def _classify_section(line: str) -> Optional[str]:
+        """Return the section a line introduces, or None if it mentions no section keyword"""
+        best = None
+        for match in _SECTION_RE.finditer(line.lower()):
+            section = _SECTION_BY_KEYWORD[match.group()]
+            if best is None or _SECTION_PRIORITY[section] < _SECTION_PRIORITY[best]:
+                best = section
+        return best
+    
     @staticmethod
     def _parse_personal_info(line: str, personal_info: PersonalInfo):
         """Extract personal information from a line"""
-        line_lower = line.lower()
-        
         # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, line)
-        if email_match and not personal_info.email:
-            personal_info.email = email_match.group()
+        if not personal_info.email:
+            email_match = _EMAIL_RE.search(line)
+            if email_match:
+                personal_info.email = email_match.group()
         
         # Phone extraction
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, line)
-        if phone_match and not personal_info.phone:
-            personal_info.phone = phone_match.group()
+        if not personal_info.phone:
+            phone_match = _PHONE_RE.search(line)
+            if phone_match:
+                personal_info.phone = phone_match.group()
         
         # Location extraction (basic)
-        if any(keyword in line_lower for keyword in ['address:', 'location:', 'city:']):
+        if not personal_info.location and _LOCATION_RE.search(line.lower()):
             location = line.split(':')[-1].strip()
-            if location and not personal_info.location:
+            if location:
                 personal_info.location = location
     
     @staticmethod
@@ -137,7 +196,7 @@ class PDFParsingService:
             skills_text = line.strip()
         
         # Split by common delimiters
-        for delimiter in [',', '•', '|', ';']:
+        for delimiter in _SKILL_DELIMITERS:
             if delimiter in skills_text:
                 skills.extend([skill.strip() for skill in skills_text.split(delimiter)])
                 break
@@ -179,8 +238,7 @@ class PDFParsingService:
             return None
         
         # Check for degree patterns
-        degree_keywords = ['bachelor', 'master', 'phd', 'degree', 'diploma', 'certificate']
-        if any(keyword in line.lower() for keyword in degree_keywords):
+        if _DEGREE_RE.search(line.lower()):
             if '|' in line:
                 parts = [part.strip() for part in line.split('|')]
                 return {
@@ -213,7 +271,7 @@ class PDFParsingService:
         # Check for bullet points
         if (line.startswith('-') or line.startswith('•')) and current_item:
             desc_text = line[1:].strip()
-            if any(keyword in desc_text.lower() for keyword in ['built', 'using', 'technology', 'stack']):
+            if _PROJECT_TECH_RE.search(desc_text.lower()):
                 current_item['technologies'] = current_item.get('technologies', '') + ' ' + desc_text
             else:
                 current_item['description'] = current_item.get('description', '') + '\n' + desc_text
@@ -0,0 +1,166 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.job_description_service import extract_skills
+
+# Bump when the digest layout or extraction rules change; older digests are rebuilt on next use
+DIGEST_VERSION = 1
+
+MAX_SKILLS = 30
+MAX_ROLES = 6
+MAX_ACHIEVEMENTS = 6
+MAX_PROJECTS = 5
+MAX_ACHIEVEMENT_CHARS = 200
+
+_YEAR_RANGE_RE = re.compile(
+    r"((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)", re.IGNORECASE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+|\s*[•▪●]\s*")
+_DIGIT_RE = re.compile(r"\d")
+
+# Title keywords that override the seniority estimated from years of experience
+_TITLE_SENIORITY = [
+    ("principal", "lead"), ("staff", "lead"), ("lead", "lead"), ("head of", "lead"), ("architect", "lead"),
+    ("senior", "senior"), ("sr.", "senior"),
+    ("intern", "entry"), ("junior", "entry"), ("jr.", "entry"), ("graduate", "entry"), ("trainee", "entry"),
+]
+_SENIORITY_RANK = {"entry": 0, "mid": 1, "senior": 2, "lead": 3}
+
+
+def _as_list(value: Any) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, dict):
+        return [value]
+    return list(value)
+
+
+def _field(item: Any, *names: str) -> str:
+    if not isinstance(item, dict):
+        return str(item) if names and names[0] in ("title", "name") else ""
+    for name in names:
+        if item.get(name):
+            return str(item[name]).strip()
+    return ""
+
+
+def resume_fields(resume: dict) -> Dict[str, Any]:
+    """
+    Structured fields of a stored resume, whether it was created as JSON
+    (kept under resume_data) or uploaded as a PDF (parsed fields at the top level)
+    """
+    source = resume.get("resume_data") or resume
+    return {
+        "personal_info": source.get("personal_info") or {},
+        "skills": _as_list(source.get("skills")),
+        "experience": _as_list(source.get("experience") or source.get("experiences")),
+        "projects": _as_list(source.get("projects")),
+        "summary": source.get("summary") or "",
+    }
+
+
+def full_resume_data(resume: dict) -> Dict[str, Any]:
+    """
+    The complete structured resume, for prompts that rewrite the resume itself
+    and so cannot work from the digest
+    """
+    if resume.get("resume_data"):
+        return resume["resume_data"]
+    return {key: resume.get(key) for key in ("personal_info", "education", "skills", "experience", "projects")}
+
+
+def _years_of_experience(durations: List[str]) -> float:
+    """Total years covered by the experience date ranges, counting overlaps once"""
+    current_year = datetime.utcnow().year
+    spans: List[Tuple[int, int]] = []
+    for duration in durations:
+        for start, end in _YEAR_RANGE_RE.findall(duration or ""):
+            end_year = current_year if not end.isdigit() else int(end)
+            if end_year >= int(start):
+                spans.append((int(start), max(end_year, int(start) + 1)))
+    total, last_end = 0, None
+    for start, end in sorted(spans):
+        if last_end is not None and start < last_end:
+            start = last_end
+        if end > start:
+            total += end - start
+            last_end = end
+    return float(total)
+
+
+def _seniority(years: float, titles: List[str]) -> str:
+    level = "entry" if years < 2 else "mid" if years < 5 else "senior"
+    for title in titles[:1]:
+        lowered = title.lower()
+        for keyword, title_level in _TITLE_SENIORITY:
+            if keyword in lowered:
+                if _SENIORITY_RANK[title_level] > _SENIORITY_RANK[level] or title_level == "entry":
+                    level = title_level
+                break
+    return level
+
+
+def _achievements(texts: List[str]) -> List[str]:
+    """Sentences with numbers in them first, then the opening sentence of each entry"""
+    quantified, openers = [], []
+    for text in texts:
+        sentences = [s.strip(" -*\t") for s in _SENTENCE_SPLIT_RE.split(text or "") if s and s.strip(" -*\t")]
+        for i, sentence in enumerate(sentences):
+            sentence = sentence[:MAX_ACHIEVEMENT_CHARS]
+            if _DIGIT_RE.search(sentence):
+                quantified.append(sentence)
+            elif i == 0:
+                openers.append(sentence)
+    picked = []
+    for sentence in quantified + openers:
+        if sentence not in picked:
+            picked.append(sentence)
+    return picked[:MAX_ACHIEVEMENTS]
+
+
+def build_digest(resume: dict, content: Optional[str] = None) -> dict:
+    """
+    Compact canonical profile of a resume for LLM prompts: skills, roles,
+    achievements and seniority. Deterministic, so the same resume always
+    yields the same digest.
+    """
+    fields = resume_fields(resume)
+    experience = [item for item in fields["experience"] if _field(item, "title", "role", "position")]
+    roles = [
+        {
+            "title": _field(item, "title", "role", "position"),
+            "company": _field(item, "company", "organization", "employer"),
+            "duration": _field(item, "duration", "dates", "period"),
+        }
+        for item in experience
+    ]
+
+    skills = []
+    texts = [", ".join(map(str, fields["skills"])), fields["summary"], content or ""]
+    texts += [_field(item, "description", "summary") for item in experience]
+    texts += [f"{_field(item, 'technologies', 'tech')} {_field(item, 'description')}" for item in fields["projects"]]
+    for skill in [str(s).strip() for s in fields["skills"]] + extract_skills("\n".join(texts)):
+        if skill and skill.lower() not in {s.lower() for s in skills}:
+            skills.append(skill)
+
+    years = _years_of_experience([role["duration"] for role in roles])
+    return {
+        "version": DIGEST_VERSION,
+        "name": _field(fields["personal_info"], "name"),
+        "seniority": _seniority(years, [role["title"] for role in roles]),
+        "years_experience": years,
+        "skills": skills[:MAX_SKILLS],
+        "roles": roles[:MAX_ROLES],
+        "achievements": _achievements(
+            [_field(item, "description", "summary") for item in experience]
+            + [_field(item, "description") for item in fields["projects"]]
+        ),
+        "projects": [_field(item, "name", "title") for item in fields["projects"] if _field(item, "name", "title")][:MAX_PROJECTS],
+    }
+
+
+def is_current(digest: Optional[dict]) -> bool:
+    return bool(digest) and digest.get("version") == DIGEST_VERSION
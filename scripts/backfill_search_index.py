@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Build search_documents entries for resumes, application kits and analyses
+stored before search existed. Safe to re-run; entries are upserted.
+
+Usage:
+    python scripts/backfill_search_index.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.blob_storage import unpack_blob  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.core.indexes import ensure_indexes  # noqa: E402
+from app.crud.job_description import attach_job_descriptions  # noqa: E402
+from app.crud.search import index_analysis, index_kit, index_resume  # noqa: E402
+
+BATCH_SIZE = 200
+
+
+async def _batches(collection):
+    batch = []
+    async for doc in db[collection].find({}):
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def backfill():
+    await ensure_indexes()
+
+    count = 0
+    async for batch in _batches("resumes"):
+        for doc in batch:
+            await index_resume(doc)
+        count += len(batch)
+    print(f"resumes: indexed {count} documents")
+
+    count = 0
+    async for batch in _batches("application_kits"):
+        await attach_job_descriptions(batch)
+        for doc in batch:
+            await index_kit(doc, await unpack_blob(doc.get("generated_content")) or {}, doc.get("job_description") or "")
+        count += len(batch)
+    print(f"application_kits: indexed {count} documents")
+
+    count = 0
+    async for batch in _batches("analyses"):
+        await attach_job_descriptions(batch)
+        for doc in batch:
+            await index_analysis(doc, doc.get("job_description") or "")
+        count += len(batch)
+    print(f"analyses: indexed {count} documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Benchmark PDFParsingService.parse_structured_data for speed and accuracy.
+
+Reports parsed lines per second and per-field extraction accuracy against
+the synthetic corpus from scripts/parser_corpus.py, so parser changes are
+judged on both.
+
+Usage:
+    python scripts/bench_parser.py --count 500 --rounds 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.pdf_service import PDFParsingService  # noqa: E402
+from parser_corpus import generate_corpus  # noqa: E402
+
+
+def _recall(expected, actual) -> float:
+    if not expected:
+        return 1.0
+    actual = set(actual)
+    return sum(1 for item in expected if item in actual) / len(expected)
+
+
+def _precision(expected, actual) -> float:
+    if not actual:
+        return 1.0 if not expected else 0.0
+    expected = set(expected)
+    return sum(1 for item in actual if item in expected) / len(actual)
+
+
+def score(parsed, truth) -> dict:
+    """Score one parse against its ground truth, each field in [0, 1]"""
+    return {
+        "email": float(parsed.personal_info.email == truth["email"]),
+        "phone": float((parsed.personal_info.phone or "").strip() in truth["phone"] and bool(parsed.personal_info.phone)),
+        "location": float(parsed.personal_info.location == truth["location"]),
+        "skills_recall": _recall(truth["skills"], parsed.skills),
+        "skills_precision": _precision(truth["skills"], parsed.skills),
+        "experience": _recall(truth["experience_titles"], [e.title for e in parsed.experience]),
+        "education": _recall(truth["education_degrees"], [e.degree for e in parsed.education]),
+        "projects": _recall(truth["project_names"], [p.name for p in parsed.projects]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume section parser")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.count, args.seed)
+    total_lines = sum(len([line for line in text.split("\n") if line.strip()]) for text, _ in corpus)
+
+    best = None
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for text, _ in corpus:
+            PDFParsingService.parse_structured_data(text, "bench")
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    totals = {}
+    for text, truth in corpus:
+        for field, value in score(PDFParsingService.parse_structured_data(text, "bench"), truth).items():
+            totals[field] = totals.get(field, 0.0) + value
+
+    print(f"resumes:        {len(corpus)}")
+    print(f"lines:          {total_lines}")
+    print(f"best round:     {best * 1000:.1f} ms")
+    print(f"lines/second:   {total_lines / best:,.0f}")
+    print("accuracy:")
+    for field, value in totals.items():
+        print(f"  {field:<17} {value / len(corpus):.3f}")
+    print(f"  {'overall':<17} {sum(totals.values()) / (len(totals) * len(corpus)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
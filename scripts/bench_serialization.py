@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Compare the default FastAPI response path (response_model validation +
+stdlib json) with the stored-document path (shape + orjson), reporting CPU
+time per response and payload bytes raw, gzipped and brotli-compressed.
+
+Usage:
+    python scripts/bench_serialization.py --iterations 200
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.responses import dumps, shape  # noqa: E402
+from app.schemas.application_kit import ApplicationKitOut, ApplicationKitSummary  # noqa: E402
+from app.schemas.pagination import Page  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def sample_kit() -> dict:
+    """A kit document shaped like a chain kit as read from Mongo"""
+    return {
+        "_id": ObjectId(),
+        "id": str(ObjectId()),
+        "user_id": str(ObjectId()),
+        "resume_id": str(ObjectId()),
+        "job_description_id": "f" * 64,
+        "job_description": "We are hiring a backend engineer with Python and Kubernetes. " * 40,
+        "generation_method": "chain",
+        "created_at": datetime.utcnow(),
+        "generated_content": {
+            "email": "Dear hiring manager,\n\n" + "I bring **Python** and **FastAPI** experience. " * 15,
+            "cover_letter": "Dear hiring team,\n\n" + "I led migrations and cut latency by 40%. " * 60,
+            "q_and_a": [{"question": f"Question {i}?", "answer": "Situation, task, action, result. " * 8} for i in range(10)],
+            "dsa": {"topics": ["Array", "Graph", "DP"] * 3,
+                    "suggested_problems": [{"question": f"Problem {i}", "approach": "Use a hash map",
+                                            "practice_link": "https://leetcode.com/problems/two-sum/"} for i in range(15)]},
+            "experiences": [{"title": f"Interview experience {i}", "link": "https://example.com/x"} for i in range(8)],
+            "playlists": [{"title": f"Playlist {i}", "channel": "Channel", "link": "https://youtube.com/x"} for i in range(8)],
+            "chain_status": [{"step": "email", "status": "success", "length": 700}] * 6,
+            "generation_time": 12.3,
+        },
+    }
+
+
+def default_path(model, content, exclude_unset: bool = False) -> bytes:
+    """What FastAPI does for a plain dict return value with response_model set"""
+    validated = model.model_validate(content).model_dump(mode="json", exclude_unset=exclude_unset)
+    return json.dumps(validated, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def bench(label: str, fn, iterations: int) -> bytes:
+    start = time.process_time()
+    for _ in range(iterations):
+        body = fn()
+    per_call = (time.process_time() - start) / iterations * 1000
+    sizes = f"raw={len(body):,}B gzip={len(gzip.compress(body, 6)):,}B"
+    if brotli is not None:
+        sizes += f" br={len(brotli.compress(body, quality=4)):,}B"
+    print(f"  {label:<22} {per_call:7.3f} ms CPU   {sizes}")
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    kit = sample_kit()
+    print("GET /application-kits/{id}")
+    bench("validate + json", lambda: default_path(ApplicationKitOut, kit), args.iterations)
+    bench("shape + orjson", lambda: dumps(shape(kit, ApplicationKitOut)), args.iterations)
+
+    page = {"items": [sample_kit() for _ in range(50)], "next": None}
+    full_page = Page[ApplicationKitOut]
+    print("GET /application-kits/?fields=generated_content,job_description (50 kits)")
+    bench("validate + json", lambda: default_path(full_page, page), args.iterations)
+    bench("shape + orjson", lambda: dumps({"items": [shape(k, ApplicationKitOut) for k in page["items"]], "next": None}),
+          args.iterations)
+
+    print("GET /application-kits/ summary (50 kits)")
+    summaries = {"items": [shape(k, ApplicationKitSummary) for k in page["items"]], "next": None}
+    for item in summaries["items"]:
+        item.pop("generated_content"), item.pop("job_description")
+    bench("validate + json", lambda: default_path(Page[ApplicationKitSummary], summaries, exclude_unset=True),
+          args.iterations)
+    bench("shape + orjson", lambda: dumps({"items": [shape(k, ApplicationKitSummary) for k in summaries["items"]],
+                                          "next": None}), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Measure how much the blob storage layer saves on large text fields.
+
+For every collection with packed fields, reports the raw size of those
+fields against what is stored in the documents themselves (GridFS-offloaded
+blobs count as zero in-document bytes). With --migrate, plain values already
+in the database are packed according to the current BLOB_* settings.
+
+Usage:
+    python scripts/blob_storage_report.py [--migrate]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.blob_storage import blob_sizes, is_packed, pack_blob  # noqa: E402
+from app.core.database import db  # noqa: E402
+
+BLOB_FIELDS = {
+    "resumes": ["content"],
+    "parsed_pdfs": ["content"],
+    "application_kits": ["job_description", "generated_content"],
+    "analyses": ["job_description"],
+    "job_descriptions": ["cleaned_text"],
+}
+
+
+async def report(migrate: bool):
+    for collection, fields in BLOB_FIELDS.items():
+        docs = raw_total = stored_total = migrated = 0
+        async for doc in db[collection].find({}, {field: 1 for field in fields}):
+            docs += 1
+            updates = {}
+            for field in fields:
+                value = doc.get(field)
+                if migrate and value is not None and not is_packed(value):
+                    packed = await pack_blob(value)
+                    if packed is not value:
+                        updates[field] = packed
+                        value = packed
+                raw, stored = blob_sizes(value)
+                raw_total += raw
+                stored_total += stored
+            if updates:
+                await db[collection].update_one({"_id": doc["_id"]}, {"$set": updates})
+                migrated += 1
+        saved = 100 * (1 - stored_total / raw_total) if raw_total else 0.0
+        print(f"{collection:<18} docs={docs:<7} raw={raw_total / 1024:,.1f}KiB "
+              f"stored={stored_total / 1024:,.1f}KiB saved={saved:.1f}%"
+              + (f" migrated={migrated}" if migrate else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report blob storage savings")
+    parser.add_argument("--migrate", action="store_true", help="Pack existing plain values in place")
+    args = parser.parse_args()
+    asyncio.run(report(args.migrate))
+
+
+if __name__ == "__main__":
+    main()
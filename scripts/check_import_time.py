@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Cold-start budget check: import app.main in fresh interpreters and fail if the
+best time exceeds the budget, or if modules meant to load lazily (the LLM SDK,
+Motor, pypdf) are imported by app startup. On failure the slowest imports are
+listed.
+
+Usage:
+    python scripts/check_import_time.py [--budget-ms 900] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load when a request needs them
+LAZY_MODULES = ["google.generativeai", "motor.motor_asyncio", "pypdf"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _run_probe() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _slowest_imports(top: int) -> list:
+    err = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                rows.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=900)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    results = [_run_probe() for _ in range(args.runs)]
+    best = min(r["ms"] for r in results)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    print(f"import app.main: best {best:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if best > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(loaded)}")
+        failed = True
+    if failed:
+        print("Slowest imports (cumulative ms):")
+        for ms, name in _slowest_imports(args.top):
+            print(f"  {ms:8.1f}  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
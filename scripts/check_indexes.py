@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+"""
+Ensure the registered MongoDB indexes exist and check that every registered
+query shape is served by an index. Exits non-zero if any shape uses a COLLSCAN.
+
+Usage:
+    python scripts/check_indexes.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.indexes import QUERY_SHAPES, ensure_indexes, verify_query_plans  # noqa: E402
+
+
+async def main() -> int:
+    failed = await ensure_indexes()
+    for name in failed:
+        print(f"FAILED to create index: {name}")
+    collscans = await verify_query_plans()
+    for shape in QUERY_SHAPES:
+        print(f"{'FAILED' if shape.name in collscans else 'ok':<9} {shape.collection}: {shape.name}")
+    return 1 if failed or collscans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
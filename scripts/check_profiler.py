@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Check that the request profiler samples on wall-clock time: a request that
+spends most of its time in a threadpool call and an await must produce
+samples for that time, not only for the CPU work on the event loop.
+Exits non-zero if any phase is under-sampled.
+
+Usage:
+    python scripts/check_profiler.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.profiling import ProfilingMiddleware, run_in_threadpool  # noqa: E402
+
+THREADPOOL_SECONDS = 0.5
+AWAIT_SECONDS = 0.3
+CPU_SECONDS = 0.15
+# Share of the expected samples a phase must get to pass; sampling jitter and thread switches lose some
+MIN_SHARE = 0.6
+
+
+def blocking_call():
+    time.sleep(THREADPOOL_SECONDS)
+
+
+def cpu_work():
+    deadline = time.perf_counter() + CPU_SECONDS
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def app(scope, receive, send):
+    await run_in_threadpool(blocking_call)
+    await asyncio.sleep(AWAIT_SECONDS)
+    cpu_work()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def profile_request() -> str:
+    headers = []
+    scope = {"type": "http", "method": "GET", "path": "/check", "headers": [(b"x-profile", settings.PROFILE_TOKEN.encode())]}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers.extend(message["headers"])
+
+    await ProfilingMiddleware(app)(scope, receive, send)
+    return dict(headers)[b"x-profile-id"].decode()
+
+
+def main() -> int:
+    settings.PROFILE_TOKEN = "check"
+    settings.PROFILE_DIR = tempfile.mkdtemp(prefix="profiles-")
+    profile_id = asyncio.run(profile_request())
+
+    path = os.path.join(settings.PROFILE_DIR, profile_id + ".folded")
+    deadline = time.monotonic() + 5
+    while not os.path.exists(os.path.join(settings.PROFILE_DIR, profile_id + ".json")):
+        if time.monotonic() > deadline:
+            print("FAILED   profile was not written")
+            return 1
+        time.sleep(0.05)
+
+    counts = {"threadpool": 0, "await": 0, "cpu": 0}
+    with open(path) as f:
+        for line in f:
+            stack, count = line.rsplit(" ", 1)
+            if "blocking_call" in stack:
+                counts["threadpool"] += int(count)
+            elif "cpu_work" in stack:
+                counts["cpu"] += int(count)
+            elif "<awaiting" in stack:
+                counts["await"] += int(count)
+
+    interval = settings.PROFILE_INTERVAL_MS / 1000
+    expected = {"threadpool": THREADPOOL_SECONDS, "await": AWAIT_SECONDS, "cpu": CPU_SECONDS}
+    failed = False
+    for phase, seconds in expected.items():
+        wanted = seconds / interval
+        ok = counts[phase] >= MIN_SHARE * wanted
+        failed |= not ok
+        print(f"{'ok' if ok else 'FAILED':<8} {phase}: {counts[phase]} samples (expected ~{wanted:.0f})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Local stand-in for Google's signing-key endpoint, for tests and offline login.
+
+Serves a JWKS at /certs (with a Cache-Control max-age like Google's) and
+issues ID tokens signed with the matching private key at
+/token?email=...&sub=...&name=... . Point GOOGLE_CERTS_URL at
+http://127.0.0.1:<port>/certs to have the API verify those tokens.
+
+It can also be used in-process:
+
+    server = LocalGoogleKeyServer(audience="my-client-id")
+    server.start()
+    token = server.issue_token(email="a@example.com", sub="123")
+    ...
+    server.stop()
+
+Usage:
+    python scripts/google_key_server.py --port 8765 --audience <GOOGLE_CLIENT_ID>
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+
+def _b64uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class LocalGoogleKeyServer:
+    """Serves a JWKS and signs Google-style ID tokens with the matching key"""
+
+    def __init__(self, audience: str, host: str = "127.0.0.1", port: int = 0, max_age: int = 3600):
+        self.audience = audience
+        self.max_age = max_age
+        self.kid = uuid.uuid4().hex
+        self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_pem = self._private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        numbers = self._private_key.public_key().public_numbers()
+        self.jwks = {"keys": [{
+            "kty": "RSA", "alg": "RS256", "use": "sig", "kid": self.kid,
+            "n": _b64uint(numbers.n), "e": _b64uint(numbers.e),
+        }]}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def certs_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/certs"
+
+    def issue_token(self, email: str, sub: str, name: str = "", expires_in: int = 3600, **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com", "aud": self.audience, "sub": sub, "email": email,
+            "email_verified": True, "name": name, "iat": now, "exp": now + expires_in, **claims,
+        }
+        return jwt.encode(payload, self._private_pem.decode(), algorithm="RS256", headers={"kid": self.kid})
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/certs":
+                    body = json.dumps(server.jwks).encode()
+                    content_type = "application/json"
+                elif url.path == "/token":
+                    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    body = server.issue_token(
+                        email=query.get("email", "user@example.com"),
+                        sub=query.get("sub", "local-user"),
+                        name=query.get("name", ""),
+                    ).encode()
+                    content_type = "text/plain"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Cache-Control", f"public, max-age={server.max_age}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Google's ID token signing keys")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--audience", required=True, help="GOOGLE_CLIENT_ID the API expects")
+    args = parser.parse_args()
+
+    server = LocalGoogleKeyServer(audience=args.audience, port=args.port)
+    print(f"JWKS:  {server.certs_url}")
+    print(f"Token: http://127.0.0.1:{args.port}/token?email=user@example.com&sub=local-user")
+    server._httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Move job description text embedded in analyses and application_kits into the
+job_descriptions collection, replacing it with a job_description_id reference.
+
+Usage:
+    python scripts/migrate_job_descriptions.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.blob_storage import unpack_blob  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.crud.job_description import get_or_create_job_description  # noqa: E402
+
+
+async def migrate():
+    for collection in ["analyses", "application_kits"]:
+        migrated = 0
+        cursor = db[collection].find(
+            {"job_description": {"$exists": True}, "job_description_id": {"$exists": False}},
+            {"job_description": 1}
+        )
+        async for doc in cursor:
+            text = await unpack_blob(doc["job_description"])
+            jd = await get_or_create_job_description(text)
+            await db[collection].update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"job_description_id": jd["_id"]}, "$unset": {"job_description": ""}}
+            )
+            migrated += 1
+        print(f"{collection}: migrated {migrated} documents")
+    print(f"job_descriptions: {await db.job_descriptions.count_documents({})} stored")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())